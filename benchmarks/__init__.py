@@ -0,0 +1,26 @@
+"""Benchmarks for the cascade ranking pipeline.
+
+Synthetic catalogs of products are ranked and evaluated for a grid of
+catalog sizes and capacities, reporting the wall time and the peak
+memory allocated (measured with tracemalloc) of each function.
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=src python -m benchmarks
+    PYTHONPATH=src python -m benchmarks --sizes 100 1000 --capacities 10
+    PYTHONPATH=src python -m benchmarks --functions best_x --json out.json
+
+Run python -m benchmarks --help for all the options. The cold start
+cost of importing the library is measured separately:
+
+    PYTHONPATH=src python -m benchmarks.imports
+
+Modules
+-------
+    catalogs:
+        Synthetic catalogs of products.
+    cascade:
+        Benchmarked functions and the code that measures them.
+    imports:
+        Cold start cost of importing the library.
+"""
@@ -0,0 +1,57 @@
+"""Command line entry point of the benchmarks."""
+
+import json
+import argparse
+from benchmarks.catalogs import CATALOGS
+from benchmarks.cascade import BENCHMARKS, run
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks for the cascade ranking pipeline.")
+    parser.add_argument("--catalogs", nargs="+", default=list(CATALOGS),
+                        choices=list(CATALOGS))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=[100, 1000, 10000])
+    parser.add_argument("--capacities", nargs="+", type=int,
+                        default=[10, 100, 1000])
+    parser.add_argument("--functions", nargs="+", default=list(BENCHMARKS),
+                        choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="do not measure peak memory")
+    parser.add_argument("--no-limits", action="store_true",
+                        help="run slow benchmarks for every size")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    header = (f"{'function':34} {'catalog':13} {'n':>6} {'M':>5} "
+              f"{'seconds':>10} {'peak MiB':>9} {'revenue':>12}")
+    print(header)
+    print("-" * len(header))
+
+    def report(result):
+        if result["seconds"] is None:
+            timing = f"{'skipped':>10} {'':>9} {'':>12}"
+        else:
+            peak = result["peak_bytes"]
+            memory = f"{peak / 2 ** 20:9.2f}" if peak >= 0 else f"{'':>9}"
+            revenue = result["revenue"]
+            revenue = f"{revenue:12.6f}" if revenue is not None \
+                else f"{'':>12}"
+            timing = f"{result['seconds']:10.4f} {memory} {revenue}"
+        print(f"{result['function']:34} {result['catalog']:13} "
+              f"{result['n_products']:6d} {result['capacity']:5d} {timing}",
+              flush=True)
+
+    results = run(args.catalogs, args.sizes, args.capacities, args.functions,
+                  repeat=args.repeat, memory=not args.no_memory,
+                  limits=not args.no_limits, report=report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
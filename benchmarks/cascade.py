@@ -0,0 +1,249 @@
+"""Benchmarked functions and the code that measures them.
+
+Every benchmark takes a Case, the inputs prepared beforehand so their
+construction is not measured, and runs one function of the library.
+Benchmarks returning a ranking (as Products) also report its expected
+revenue, to compare the quality of the approximate modes against the
+exact ones.
+
+Functions
+---------
+    make_case:
+        It prepares the inputs of the benchmarks.
+    measure:
+        It measures the wall time and peak memory of a benchmark.
+    run:
+        It runs a grid of benchmarks.
+"""
+
+import gc
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from typing import Callable, Dict, List, Tuple
+from scipy.stats import randint
+from revenue_maximization_ranking.cascade.best_x import best_x, \
+                                                       best_x_full_capacity
+from revenue_maximization_ranking.cascade.dataframe import full_best_x, \
+                                                          expected_revenue
+from revenue_maximization_ranking.cascade\
+    .fixed_attention import optimal_rankings, fast_optimal_rankings
+from revenue_maximization_ranking.cascade.products import Products
+from revenue_maximization_ranking.cascade.revenue import expected_revenues
+from revenue_maximization_ranking.cascade\
+    .local_search import best_x_local_search
+from benchmarks.catalogs import make_catalog
+
+__all__ = ["BENCHMARKS", "LIMITS", "Case", "make_case", "measure", "run"]
+
+Case = namedtuple("Case", ["products", "dictionary", "df", "g", "capacity"])
+
+
+def make_case(catalog: str, n_products: int, capacity: int,
+              seed: int = 0) -> Case:
+    """It prepares the inputs of the benchmarks.
+
+    Attention spans are uniform on 1, 2, ..., capacity.
+
+    Parameters
+    ----------
+        catalog: str
+            Name of the synthetic catalog.
+        n_products: int
+            Number of products.
+        capacity: int
+            Maximum number of products to be displayed.
+        seed: int, default 0
+            Seed of the catalog.
+
+    Returns
+    -------
+        case: Case
+            Products as Products, dictionary and dataframe, the
+            distribution of attention spans and the capacity.
+    """
+
+    products = make_catalog(catalog, n_products, seed=seed)
+    df = pd.DataFrame({"revenue": products.revenue,
+                       "probability": products.probability},
+                      index=products.ids)
+    best_ranking = best_x_full_capacity(products, randint(1, capacity + 1),
+                                        capacity, show_xs=False)
+    df["rank"] = pd.Series(np.arange(1, len(best_ranking) + 1),
+                           index=best_ranking.ids)
+    return Case(products, products.to_dict(), df, randint(1, capacity + 1),
+                capacity)
+
+
+def bench_optimal_rankings_reference(case: Case):
+    optimal_rankings(case.dictionary, case.capacity)
+
+
+def bench_optimal_rankings(case: Case):
+    fast_optimal_rankings(case.products, case.capacity)
+
+
+def bench_best_x(case: Case):
+    best_x(case.products, case.g, case.capacity)
+
+
+def bench_best_x_full_capacity(case: Case):
+    return best_x_full_capacity(case.products, case.g, case.capacity,
+                                show_xs=False)
+
+
+def bench_best_x_full_capacity_incremental(case: Case):
+    return best_x_full_capacity(case.products, case.g, case.capacity,
+                                show_xs=False, incremental=True)
+
+
+def bench_best_x_full_capacity_pruned(case: Case):
+    return best_x_full_capacity(case.products, case.g, case.capacity,
+                                show_xs=False, prune=True)
+
+
+def bench_best_x_full_capacity_eps_001(case: Case):
+    return best_x_full_capacity(case.products, case.g, case.capacity,
+                                show_xs=False, epsilon=0.01)
+
+
+def bench_best_x_full_capacity_eps_01(case: Case):
+    return best_x_full_capacity(case.products, case.g, case.capacity,
+                                show_xs=False, epsilon=0.1)
+
+
+def bench_best_x_local_search(case: Case):
+    return best_x_local_search(case.products, case.g, case.capacity,
+                               time_limit=10.0).ranking
+
+
+def bench_full_best_x(case: Case):
+    full_best_x(case.df, "revenue", "probability", case.g, case.capacity)
+
+
+def bench_expected_revenue(case: Case):
+    expected_revenue(case.df, "revenue", "probability", "rank", case.g)
+
+
+BENCHMARKS = {
+    "optimal_rankings_reference": bench_optimal_rankings_reference,
+    "optimal_rankings": bench_optimal_rankings,
+    "best_x": bench_best_x,
+    "best_x_full_capacity": bench_best_x_full_capacity,
+    "best_x_full_capacity_incremental":
+        bench_best_x_full_capacity_incremental,
+    "best_x_full_capacity_pruned": bench_best_x_full_capacity_pruned,
+    "best_x_full_capacity_eps_0.01": bench_best_x_full_capacity_eps_001,
+    "best_x_full_capacity_eps_0.1": bench_best_x_full_capacity_eps_01,
+    "best_x_local_search": bench_best_x_local_search,
+    "full_best_x": bench_full_best_x,
+    "expected_revenue": bench_expected_revenue,
+}
+
+# Largest n_products * capacity run by default for slow benchmarks.
+LIMITS = {"optimal_rankings_reference": 10 ** 5}
+
+
+def measure(benchmark: Callable, case: Case, repeat: int = 1,
+            memory: bool = True) -> Tuple[float, int, object]:
+    """It measures the wall time and peak memory of a benchmark.
+
+    Time is the best of repeat runs without tracing memory, the peak
+    memory comes from an extra run traced by tracemalloc.
+
+    Parameters
+    ----------
+        benchmark: Callable
+            One of BENCHMARKS.
+        case: Case
+            Inputs of the benchmark.
+        repeat: int, default 1
+            Number of timed runs.
+        memory: bool, default True
+            Should the peak memory be measured?
+
+    Returns
+    -------
+        seconds, peak, output: tuple[float, int, object]
+            Wall time in seconds, peak memory in bytes (-1 if not
+            measured) and what the benchmark returned.
+    """
+
+    seconds = float("inf")
+    output = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        output = benchmark(case)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak = -1
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            benchmark(case)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return seconds, peak, output
+
+
+def run(catalogs, sizes, capacities, functions, repeat: int = 1,
+        memory: bool = True, limits: bool = True,
+        report: Callable = None) -> List[Dict]:
+    """It runs a grid of benchmarks.
+
+    Parameters
+    ----------
+        catalogs, sizes, capacities, functions: Iterable
+            Names of the catalogs, numbers of products, capacities and
+            names of the benchmarks to be run.
+        repeat: int, default 1
+            Number of timed runs of each benchmark.
+        memory: bool, default True
+            Should the peak memory be measured?
+        limits: bool, default True
+            Should slow benchmarks be skipped above their LIMITS?
+        report: optional, Callable
+            Called with every result as soon as it is measured.
+
+    Returns
+    -------
+        results: list
+            One dictionary per benchmark run.
+    """
+
+    results = []
+    for catalog in catalogs:
+        for n_products in sizes:
+            for capacity in capacities:
+                if capacity > n_products:
+                    continue
+                case = make_case(catalog, n_products, capacity)
+                for name in functions:
+                    result = {"function": name, "catalog": catalog,
+                              "n_products": n_products,
+                              "capacity": capacity}
+                    if limits and n_products * capacity > LIMITS.get(
+                            name, float("inf")):
+                        result.update(seconds=None, peak_bytes=None,
+                                      revenue=None)
+                    else:
+                        seconds, peak, output = measure(
+                            BENCHMARKS[name], case, repeat=repeat,
+                            memory=memory)
+                        revenue = None
+                        if isinstance(output, Products):
+                            revenue = float(expected_revenues(
+                                output.revenue, output.probability, case.g))
+                        result.update(seconds=seconds, peak_bytes=peak,
+                                      revenue=revenue)
+                    results.append(result)
+                    if report is not None:
+                        report(result)
+
+    return results
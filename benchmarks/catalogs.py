@@ -0,0 +1,78 @@
+"""Synthetic catalogs of products.
+
+Every catalog generator takes the number of products and a numpy random
+generator and returns the revenues and the probabilities of the
+products.
+
+Catalogs
+--------
+    uniform:
+        Uniform revenues and probabilities.
+    heavy_tailed:
+        Pareto distributed revenues, a few products are very expensive.
+    near_zero:
+        Probabilities close to zero.
+    near_one:
+        Probabilities close to one.
+"""
+
+import numpy as np
+from typing import Tuple
+from revenue_maximization_ranking.cascade.products import Products
+
+__all__ = ["CATALOGS", "make_catalog"]
+
+
+def uniform(n_products: int,
+            rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Uniform revenues and probabilities."""
+    return (rng.uniform(1.0, 100.0, n_products),
+            rng.uniform(0.0, 1.0, n_products))
+
+
+def heavy_tailed(n_products: int,
+                 rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Pareto distributed revenues, a few products are very expensive."""
+    return (1.0 + rng.pareto(1.5, n_products),
+            rng.uniform(0.0, 0.5, n_products))
+
+
+def near_zero(n_products: int,
+              rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Probabilities close to zero."""
+    return (rng.uniform(1.0, 100.0, n_products),
+            rng.uniform(0.0, 1e-3, n_products))
+
+
+def near_one(n_products: int,
+             rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Probabilities close to one."""
+    return (rng.uniform(1.0, 100.0, n_products),
+            1.0 - rng.uniform(0.0, 1e-3, n_products))
+
+
+CATALOGS = {"uniform": uniform, "heavy_tailed": heavy_tailed,
+            "near_zero": near_zero, "near_one": near_one}
+
+
+def make_catalog(name: str, n_products: int, seed: int = 0) -> Products:
+    """It builds a synthetic catalog.
+
+    Parameters
+    ----------
+        name: str
+            Name of the catalog, one of CATALOGS.
+        n_products: int
+            Number of products.
+        seed: int, default 0
+            Seed of the random generator.
+
+    Returns
+    -------
+        products: Products
+            The catalog, ids are 0, 1, ..., n_products - 1.
+    """
+
+    revenue, probability = CATALOGS[name](n_products,
+                                          np.random.default_rng(seed))
+    return Products(np.arange(n_products), revenue, probability)
@@ -0,0 +1,156 @@
+"""Cold start cost of importing the library.
+
+Every module is imported in a fresh interpreter, measuring the wall
+time of the import and checking which heavy dependencies it loaded.
+The dict and array solvers must not load pandas nor scipy, the
+benchmark fails (exit status 1) if one of them does or if an import
+takes longer than the time budget.
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=src python -m benchmarks.imports
+    PYTHONPATH=src python -m benchmarks.imports --budget 0.5 --repeat 5
+
+Functions
+---------
+    measure_import:
+        It measures the import of a module in a fresh interpreter.
+    run:
+        It measures every module and checks the cold start cost.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+__all__ = ["HEAVY", "LIGHT_MODULES", "measure_import", "run"]
+
+# Dependencies that the lightweight modules must not import.
+HEAVY = ["pandas", "scipy", "pyarrow"]
+
+LIGHT_MODULES = [
+    "revenue_maximization_ranking.cascade",
+    "revenue_maximization_ranking.cascade.attention",
+    "revenue_maximization_ranking.cascade.products",
+    "revenue_maximization_ranking.cascade.revenue",
+    "revenue_maximization_ranking.cascade.fixed_attention",
+    "revenue_maximization_ranking.cascade.best_x",
+    "revenue_maximization_ranking.cascade.local_search",
+    "revenue_maximization_ranking.cascade.learning",
+    "revenue_maximization_ranking.cascade.robust",
+    "revenue_maximization_ranking.cascade.simulate",
+    "revenue_maximization_ranking.cascade.streaming",
+    "revenue_maximization_ranking.cascade.parallel",
+]
+
+_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [name for name in {heavy!r}
+                            if name in sys.modules]]))
+"""
+
+
+def measure_import(module: str, repeat: int = 3) -> Tuple[float, List[str]]:
+    """It measures the import of a module in a fresh interpreter.
+
+    Parameters
+    ----------
+        module: str
+            Name of the module to be imported.
+        repeat: int, default 3
+            Number of interpreters started, the fastest import is kept.
+
+    Returns
+    -------
+        seconds: float
+            Wall time of the import.
+        loaded: list
+            Heavy dependencies loaded by the import.
+    """
+
+    script = _SCRIPT.format(module=module, heavy=HEAVY)
+    best, loaded = float("inf"), []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", script],
+                                check=True, capture_output=True, text=True,
+                                env=os.environ.copy()).stdout
+        seconds, loaded = json.loads(output)
+        best = min(best, seconds)
+
+    return best, loaded
+
+
+def run(modules: List[str], budget: float, repeat: int = 3,
+        report=None) -> Tuple[List[Dict], bool]:
+    """It measures every module and checks the cold start cost.
+
+    Parameters
+    ----------
+        modules: list
+            Names of the modules to be imported.
+        budget: float
+            Maximum number of seconds an import may take.
+        repeat: int, default 3
+            Number of interpreters started for each module.
+        report: optional, callable
+            Called with the result of every module once measured.
+
+    Returns
+    -------
+        results: list
+            One dict per module with its import time and the heavy
+            dependencies it loaded.
+        ok: bool
+            Whether every module is within budget and lightweight.
+    """
+
+    results = []
+    ok = True
+    for module in modules:
+        seconds, loaded = measure_import(module, repeat)
+        result = {"module": module, "seconds": seconds, "loaded": loaded,
+                  "ok": seconds <= budget and not loaded}
+        ok = ok and result["ok"]
+        results.append(result)
+        if report is not None:
+            report(result)
+
+    return results, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.imports",
+        description="Cold start cost of importing the library.")
+    parser.add_argument("--modules", nargs="+", default=LIGHT_MODULES)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="maximum seconds per import")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    header = f"{'module':56} {'seconds':>8}  heavy imports"
+    print(header)
+    print("-" * len(header))
+
+    def report(result):
+        status = "" if result["ok"] else "  FAIL"
+        print(f"{result['module']:56} {result['seconds']:8.4f}  "
+              f"{', '.join(result['loaded']) or '-'}{status}", flush=True)
+
+    results, ok = run(args.modules, args.budget, repeat=args.repeat,
+                      report=report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
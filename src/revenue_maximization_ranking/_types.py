@@ -7,9 +7,12 @@ Types
         like a scipy.stats distribution.
 """
 
-from typing import Union, Any
-from scipy.stats._distn_infrastructure import rv_frozen
+from typing import TYPE_CHECKING, Union, Any
+
+if TYPE_CHECKING:
+    # Only for type checkers, importing scipy.stats at runtime is slow.
+    from scipy.stats._distn_infrastructure import rv_frozen
 
 # A distribution like object for this library must implement the sf and
 # pmf methods.
-DistributionLike = Union[rv_frozen, Any]
+DistributionLike = Union["rv_frozen", Any]
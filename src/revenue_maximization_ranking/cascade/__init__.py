@@ -22,11 +22,44 @@ Functions
 ---------
     full_best_x:
         Implements the full_best_x ranking on a dataframe.
+    full_best_x_grouped:
+        Implements the full_best_x ranking for every group of a
+        dataframe.
+    full_best_x_sweep:
+        Implements the full_best_x ranking for many capacities at once.
     expected_revenue:
         It calculates the expected revenue for the cascade model.
+    expected_revenue_grouped:
+        It calculates the expected revenue of every group of a
+        dataframe.
+    expected_revenue_matrix:
+        It calculates the expected revenue of many rankings under many
+        distributions of attention spans.
+
+The functions above work on pandas dataframes and pandas is imported
+the first time one of them is used. The solvers on dicts and numpy
+arrays (best_x, fixed_attention, revenue, ...) import neither pandas
+nor scipy, so they start fast.
 """
 
-from revenue_maximization_ranking.cascade.dataframe import full_best_x, \
-                                                           expected_revenue
+import importlib
+
+__all__ = ["full_best_x", "full_best_x_grouped", "full_best_x_sweep",
+           "expected_revenue", "expected_revenue_grouped",
+           "expected_revenue_matrix"]
+
+
+def __getattr__(name: str):
+    """The dataframe functions are imported on first use."""
+    if name in __all__:
+        dataframe = importlib.import_module(
+            "revenue_maximization_ranking.cascade.dataframe")
+        value = getattr(dataframe, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["full_best_x", "expected_revenue"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,215 @@
+"""Attention spans.
+
+The algorithms in this module only need the distribution of attention
+spans X through G(x) = Prob(X >= x) = g.sf(x) + g.pmf(x). Calling a
+scipy.stats frozen distribution once per x is slow because every call
+validates its arguments, so here G is evaluated for a whole range of
+attention spans at once and the result is cached per distribution.
+
+Besides a DistributionLike object, a plain numpy array of attention
+probabilities can be used as the distribution: a[x] is the probability
+of an attention span equal to x for x = 0, 1, ..., len(a) - 1.
+
+Functions
+---------
+    survival:
+        It evaluates G(x) = Prob(X >= x) for x = 1, 2, ..., size.
+    survival_stack:
+        It evaluates G(x) for many distributions at once.
+    cache_info:
+        Statistics of the survival cache.
+    clear_cache:
+        It empties the survival cache.
+"""
+
+import numpy as np
+from threading import Lock
+from collections import OrderedDict, namedtuple
+from typing import Hashable, Sequence, Union
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["survival", "survival_stack", "cache_info", "clear_cache"]
+
+# Maximum number of distributions whose survival values are cached.
+MAX_CACHE_SIZE = 128
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_cache = OrderedDict()
+_lock = Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def distribution_key(g: DistributionLike) -> Hashable:
+    """A hashable key identifying a distribution.
+
+    Frozen scipy.stats distributions are identified by the class,
+    name and support of their distribution and by their parameters, so
+    equal distributions created separately share the same key.
+    Distributions defined by explicit values and any other object are
+    identified by their id, the cache keeps a reference to them so the
+    id is not reused while the entry is alive.
+
+    Parameters
+    ----------
+        g: DistributionLike
+            Distribution of attention spans.
+
+    Returns
+    -------
+        key: Hashable
+            The key of the distribution.
+    """
+
+    dist = getattr(g, "dist", None)
+    args = getattr(g, "args", None)
+    kwds = getattr(g, "kwds", None)
+    if (dist is not None and args is not None and kwds is not None
+            and not hasattr(dist, "xk")):
+        key = ("frozen", type(dist), getattr(dist, "name", None),
+               getattr(dist, "a", None), getattr(dist, "b", None),
+               tuple(args), tuple(sorted(kwds.items())))
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            pass
+
+    return "object", id(g)
+
+
+def _evaluate(g: Union[DistributionLike, np.ndarray],
+              size: int) -> np.ndarray:
+    """G(x) for x = 1, 2, ..., size without caching."""
+
+    if isinstance(g, np.ndarray):
+        tail = np.cumsum(np.asarray(g, dtype=np.float64)[::-1])[::-1]
+        values = np.zeros(size, dtype=np.float64)
+        available = tail[1:size + 1]
+        values[:available.shape[0]] = available
+        return values
+
+    x = np.arange(1, size + 1)
+    profiling.count("sf_calls")
+    profiling.count("pmf_calls")
+    try:
+        values = np.asarray(g.sf(x) + g.pmf(x), dtype=np.float64)
+        if values.shape == x.shape:
+            return values
+    except (TypeError, ValueError):
+        pass
+
+    # Distributions whose sf and pmf only take scalars.
+    profiling.count("sf_calls", size)
+    profiling.count("pmf_calls", size)
+    return np.array([g.sf(i) + g.pmf(i) for i in range(1, size + 1)],
+                    dtype=np.float64)
+
+
+def survival(g: Union[DistributionLike, np.ndarray], size: int) -> np.ndarray:
+    """It evaluates G(x) = Prob(X >= x) for x = 1, 2, ..., size.
+
+    Results for DistributionLike objects are kept in a least recently
+    used cache of at most MAX_CACHE_SIZE distributions. Arrays of
+    attention probabilities are not cached.
+
+    Parameters
+    ----------
+        g: DistributionLike or numpy.ndarray
+            Distribution of attention spans, or the probabilities of
+            each attention span 0, 1, 2, ...
+        size: int
+            Largest attention span to be evaluated.
+
+    Returns
+    -------
+        values: numpy.ndarray
+            Read-only array with G(x) at position x - 1.
+    """
+
+    size = max(int(size), 0)
+    profiling.count("survival_lookups", size)
+    if isinstance(g, np.ndarray):
+        values = _evaluate(g, size)
+        values.flags.writeable = False
+        return values
+
+    key = distribution_key(g)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[1].shape[0] >= size:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[1][:size]
+
+        _stats["misses"] += 1
+
+    values = _evaluate(g, size)
+    values.flags.writeable = False
+    with _lock:
+        _cache[key] = (g, values)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return values
+
+
+def survival_stack(gs: Union[Sequence, np.ndarray],
+                   size: int) -> np.ndarray:
+    """It evaluates G(x) for many distributions at once.
+
+    Parameters
+    ----------
+        gs: sequence or numpy.ndarray
+            Distributions of attention spans, each one a
+            DistributionLike or an array of attention probabilities
+            (see survival). A two dimensional array is taken as
+            survival vectors instead, G_d(x) at row d and column x - 1,
+            missing columns are zeros.
+        size: int
+            Largest attention span to be evaluated.
+
+    Returns
+    -------
+        values: numpy.ndarray
+            Array of shape (len(gs), size) with G_d(x) at row d and
+            column x - 1.
+    """
+
+    size = max(int(size), 0)
+    if isinstance(gs, np.ndarray) and gs.ndim == 2:
+        values = np.zeros((gs.shape[0], size), dtype=np.float64)
+        available = min(gs.shape[1], size)
+        values[:, :available] = gs[:, :available]
+        return values
+
+    values = np.zeros((len(gs), size), dtype=np.float64)
+    for d, g in enumerate(gs):
+        values[d] = survival(g, size)
+
+    return values
+
+
+def cache_info() -> CacheInfo:
+    """Statistics of the survival cache.
+
+    Returns
+    -------
+        info: CacheInfo
+            Named tuple with hits, misses, maxsize and currsize.
+    """
+
+    with _lock:
+        return CacheInfo(_stats["hits"], _stats["misses"], MAX_CACHE_SIZE,
+                         len(_cache))
+
+
+def clear_cache():
+    """It empties the survival cache and resets its statistics."""
+
+    with _lock:
+        _cache.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
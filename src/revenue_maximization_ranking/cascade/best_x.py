@@ -35,22 +35,64 @@ Functions
 ---------
     best_x:
         It finds the x for the maximum lower bound on expected revenue.
+    best_x_stack:
+        best_x under many distributions of attention spans at once.
 
     best_x_full_capacity:
         It completes the best-x strategy up to full capacity.
+    full_capacity_positions:
+        best_x_full_capacity on arrays of products.
+    best_x_sweep:
+        best_x_full_capacity for many capacities at once.
+    sweep_positions:
+        best_x_sweep on arrays of products.
+    table_rounds:
+        The best-x rounds up to full capacity over a solved table.
+    choose_x:
+        It picks the best x given the optimal revenues.
+    choose_xs:
+        choose_x for many distributions of attention spans at once.
+    approximate_round:
+        A best-x round over bounded attention spans with a certified
+        gap.
+    approximate_positions:
+        best_x_full_capacity over bounded attention spans.
+
+Approximate mode:
+  The dynamic programming table costs O(N * M) but the best x is often
+much smaller than M. H(x) never exceeds the optimal revenue without
+capacity, which takes O(N) to compute, so every x > K has a best-x
+objective H(x) * G(x) of at most that revenue times G(K + 1). With a
+positive epsilon each round only solves attention spans up to K, on
+the products dominated by fewer than K others, doubling K until that
+bound is within a factor 1 + epsilon of the best objective found. The
+chosen ranking is then never further than epsilon times the exact
+objective of the round, and the certified gap (the bound minus the
+objective found) is returned.
 """
 
-from copy import copy
-from typing import Tuple, List, Dict, Union
+import numpy as np
+from typing import Tuple, List, Dict, Sequence, Union
 from revenue_maximization_ranking.cascade\
-                                 .fixed_attention import optimal_rankings
+    .fixed_attention import dp_table, backtrack, ranking_order, \
+    dominated, FixedAttentionTable
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking.cascade.attention import survival, \
+                                                           survival_stack
 from revenue_maximization_ranking._types import DistributionLike
 
-__all__ = ["best_x_full_capacity", "best_x"]
+__all__ = ["best_x_full_capacity", "best_x", "best_x_stack", "best_x_sweep"]
+
+# First bound on the attention spans solved by the approximate mode.
+INITIAL_BOUND = 16
 
 
-def best_x(products: Dict, g: DistributionLike, capacity: int,
-           offset: int = 0) -> Tuple[int, List]:
+def best_x(products: Union[Dict, Products], g: DistributionLike,
+           capacity: int, offset: int = 0, epsilon: float = 0.0,
+           show_gap: bool = False) -> Tuple:
     """It finds the x for the maximum lower bound on expected revenue.
 
     Given a set of products each fixed attention span "x" from
@@ -60,44 +102,182 @@ def best_x(products: Dict, g: DistributionLike, capacity: int,
 
     Parameters
     ----------
-        products: dict
+        products: dict or Products
             Set of products, keys must be the product ids and values
             must be dictionaries with the revenue and probability of
             each product.
         g: DistributionLike
-            Distribution of attention spans.
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
         capacity: int
             Maximum number of items that the retailer can display.
         offset: optional, int, default 0
             An offset to be used when calling the distribution g.
+        epsilon: optional, float, default 0.0
+            If positive the approximate mode is used, the gap is at
+            most epsilon times the exact objective.
+        show_gap: bool, optional, default: False
+            Should the function return the certified gap?
 
     Returns
     -------
         best_x_value, rankings[best_x_value]: tuple[int, list]
-            The best-x and its optimal ranking.
+            The best-x and its optimal ranking, the ranking is Products
+            when the products are given as Products.
+        gap: float, optional
+            Upper bound on how much larger the best-x objective of the
+            exact solution is, 0 without approximation.
+    """
+
+    prods = as_products(products)
+    prods = prods.take(prods.key_order())
+    gap = 0.0
+    if epsilon > 0:
+        best_x_value, positions, gap = approximate_round(
+            prods.revenue, prods.probability, g, capacity, offset, epsilon)
+        ranking = prods.take(positions)
+    else:
+        h, choice = dp_table(prods.revenue, prods.probability,
+                             min(len(prods), capacity))
+        best_x_value = choose_x(h, g, offset)
+        # best_x_value could be 0 depending on the distribution g, then
+        # the ranking is empty.
+        with profiling.stage("backtrack"):
+            picked = backtrack(choice, best_x_value)
+            ranking = prods.take(ranking_order(picked, prods.revenue,
+                                               prods.probability))
+    if show_gap:
+        return best_x_value, match_format(ranking, products), gap
+
+    return best_x_value, match_format(ranking, products)
+
+
+def choose_x(revenues: np.ndarray, g: DistributionLike,
+             offset: int = 0) -> int:
+    """It picks the best x given the optimal revenues.
+
+    Parameters
+    ----------
+        revenues: numpy.ndarray
+            Optimal revenues for the fixed attention problem,
+            revenues[x] is the revenue for attention span x (the first
+            element is ignored).
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        offset: optional, int, default 0
+            An offset to be used when calling the distribution g.
+
+    Returns
+    -------
+        best_x_value: int
+            The x with the maximum lower bound on expected revenue, 0
+            if no lower bound is positive.
     """
 
-    rankings, revenues = optimal_rankings(products=products,
-                                          capacity=capacity)
-    maximum_lower_bound = 0.0
-    best_x_value = 0
-    for x, revenue_best_assort in revenues.items():
-        revenue_lower_bound = revenue_best_assort * (g.sf(x + offset)
-                                                     + g.pmf(x + offset))
-        if revenue_lower_bound > maximum_lower_bound:
-            best_x_value = x
-            maximum_lower_bound = revenue_lower_bound
-
-    if best_x_value == 0:
+    max_x = revenues.shape[0] - 1
+    if max_x < 1:
+        return 0
+
+    with profiling.stage("choose_x"):
+        lower_bounds = revenues[1:] * survival(g, max_x + offset)[offset:]
+        best_x_value = int(np.argmax(lower_bounds))
+    if not lower_bounds[best_x_value] > 0.0:
         # This could happen depending on the distribution g
-        return 0, []
+        return 0
+
+    return best_x_value + 1
+
+
+def best_x_stack(products: Union[Dict, Products],
+                 gs: Union[Sequence, np.ndarray], capacity: int,
+                 offset: int = 0) -> Tuple[List, List]:
+    """best_x under many distributions of attention spans at once.
+
+    The dynamic programming table does not depend on the distribution,
+    so it is solved once and only the choice of x is repeated for each
+    distribution. Distributions choosing the same x share its ranking.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products, keys must be the product ids and values
+            must be dictionaries with the revenue and probability of
+            each product.
+        gs: sequence or numpy.ndarray
+            Distributions of attention spans or a two dimensional
+            array of survival vectors (see attention.survival_stack).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        offset: optional, int, default 0
+            An offset to be used when calling the distributions.
+
+    Returns
+    -------
+        best_x_values, rankings: tuple[list, list]
+            The best-x under each distribution and its optimal ranking,
+            as best_x would return them for that distribution.
+    """
+
+    prods = as_products(products)
+    prods = prods.take(prods.key_order())
+    h, choice = dp_table(prods.revenue, prods.probability,
+                         min(len(prods), capacity))
+    best_x_values = choose_xs(h, gs, offset)
+    rankings = {}
+    with profiling.stage("backtrack"):
+        for x in set(best_x_values):
+            picked = backtrack(choice, x)
+            rankings[x] = match_format(
+                prods.take(ranking_order(picked, prods.revenue,
+                                         prods.probability)), products)
+
+    return best_x_values, [rankings[x] for x in best_x_values]
 
-    return best_x_value, rankings[best_x_value]
 
+def choose_xs(revenues: np.ndarray, gs: Union[Sequence, np.ndarray],
+              offset: int = 0) -> List[int]:
+    """choose_x for many distributions of attention spans at once.
+
+    Parameters
+    ----------
+        revenues: numpy.ndarray
+            Optimal revenues for the fixed attention problem,
+            revenues[x] is the revenue for attention span x (the first
+            element is ignored).
+        gs: sequence or numpy.ndarray
+            Distributions of attention spans or a two dimensional
+            array of survival vectors (see attention.survival_stack).
+        offset: optional, int, default 0
+            An offset to be used when calling the distributions.
+
+    Returns
+    -------
+        best_x_values: list
+            The best x under each distribution, 0 when no lower bound
+            is positive.
+    """
 
-def best_x_full_capacity(products: Dict, g: DistributionLike, capacity: int,
-                         show_xs: bool = True) -> Union[List,
-                                                        Tuple[List, List]]:
+    max_x = revenues.shape[0] - 1
+    n_distributions = len(gs)
+    if max_x < 1:
+        return [0] * n_distributions
+
+    with profiling.stage("choose_x"):
+        attention = survival_stack(gs, max_x + offset)[:, offset:]
+        lower_bounds = revenues[1:] * attention
+        best = np.argmax(lower_bounds, axis=1)
+        positive = lower_bounds[np.arange(n_distributions), best] > 0.0
+
+    return [int(x) for x in np.where(positive, best + 1, 0)]
+
+
+def best_x_full_capacity(products: Union[Dict, Products], g: DistributionLike,
+                         capacity: int, show_xs: bool = True,
+                         incremental: bool = False,
+                         prune: bool = False, epsilon: float = 0.0,
+                         show_gap: bool = False) -> Union[List, Products,
+                                                          Tuple]:
     """It completes the best-x strategy up to full capacity.
 
     Since the "best" x can be much smaller than the capacity M this
@@ -113,16 +293,33 @@ def best_x_full_capacity(products: Dict, g: DistributionLike, capacity: int,
 
     Parameters
     ----------
-        products: dict
+        products: dict or Products
             Set of products, keys must be the product ids and values
             must be dictionaries with the revenue and probability of
             each product.
         g: DistributionLike
-            Distribution of attention spans.
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
         capacity: int
             Maximum number of items that the retailer can display.
         show_xs: bool, optional, default: False
             Should the function return the list of "best-x"'s chosen?
+        incremental: bool, optional, default: False
+            If True the dynamic programming table is solved only once
+            and every round just updates the rows affected by the
+            removed products (see FixedAttentionTable). The result is
+            the same but the whole table is kept in memory.
+        prune: bool, optional, default: False
+            If True products dominated by at least capacity others are
+            discarded before solving (see
+            fixed_attention.dominance_filter).
+        epsilon: optional, float, default 0.0
+            If positive every round uses the approximate mode, with a
+            gap of at most epsilon times the exact objective of the
+            round. Dominated products are always pruned and
+            incremental is ignored.
+        show_gap: bool, optional, default: False
+            Should the function return the certified gaps?
 
     Returns
     -------
@@ -130,30 +327,420 @@ def best_x_full_capacity(products: Dict, g: DistributionLike, capacity: int,
             Ranking of products from this iterative "best-x" strategy.
             Length of this ranking is min(M, max_x) where max_x is the
             maximum attention considered by the distribution of
-            attention spans.
+            attention spans. It is Products when the products are given
+            as Products.
         best_xs: list, optional
             List of xs' values chosen by the algorithm.
+        gaps: list, optional
+            For each round, an upper bound on how much larger the
+            best-x objective of the exact round over the same remaining
+            products is, zeros without approximation.
+    """
+
+    prods = as_products(products)
+    order = prods.key_order()
+    revenue, probability = prods.revenue[order], prods.probability[order]
+    if epsilon > 0:
+        positions, best_xs, gaps = approximate_positions(
+            revenue, probability, g, capacity, epsilon)
+    else:
+        positions, best_xs = full_capacity_positions(
+            revenue, probability, g, capacity, incremental=incremental,
+            prune=prune)
+        gaps = [0.0] * len(best_xs)
+    full_ranking = match_format(prods.take(order[positions]), products)
+    result = (full_ranking,)
+    if show_xs:
+        result += (best_xs,)
+    if show_gap:
+        result += (gaps,)
+
+    return result if len(result) > 1 else full_ranking
+
+
+def full_capacity_positions(revenue: np.ndarray, probability: np.ndarray,
+                            g: DistributionLike, capacity: int,
+                            incremental: bool = False,
+                            prune: bool = False) -> Tuple[np.ndarray, List]:
+    """best_x_full_capacity on arrays of products.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        incremental: bool, optional, default: False
+            Should the dynamic programming table be reused across
+            rounds? See best_x_full_capacity.
+        prune: bool, optional, default: False
+            Should dominated products be discarded before solving? See
+            best_x_full_capacity.
+
+    Returns
+    -------
+        positions, best_xs: tuple[numpy.ndarray, list]
+            Positions in the input arrays of the ranked products, in
+            ranking order, and the list of xs' values chosen.
     """
 
+    n_items_to_rank = min(revenue.shape[0], capacity)
+    if prune:
+        kept = np.flatnonzero(~dominated(revenue, probability,
+                                         n_items_to_rank))
+        positions, best_xs = full_capacity_positions(revenue[kept],
+                                                     probability[kept], g,
+                                                     capacity,
+                                                     incremental=incremental)
+        return kept[positions], best_xs
+
+    if incremental:
+        table = FixedAttentionTable(revenue, probability, n_items_to_rank)
+        return table_rounds(table, g, n_items_to_rank)
+
+    remaining = np.arange(revenue.shape[0])
     offset = 0
-    full_ranking = []
+    ranked = []
     best_xs = []
-    n_items_to_rank = min(len(products), capacity)
-    prods = copy(products)
     while n_items_to_rank > offset:
-        x, ranking = best_x(products=prods, g=g,
-                            capacity=n_items_to_rank - offset, offset=offset)
+        profiling.best_x_round(remaining.shape[0])
+        revenue_, probability_ = revenue[remaining], probability[remaining]
+        h, choice = dp_table(revenue_, probability_, n_items_to_rank - offset)
+        x = choose_x(h, g, offset)
         if x == 0:
             break
 
-        prods = {k: v for k, v in prods.items()
-                 if k not in [name for name, _ in ranking]}
+        with profiling.stage("backtrack"):
+            picked = backtrack(choice, x)
+            ranked.append(remaining[ranking_order(picked, revenue_,
+                                                  probability_)])
+        best_xs.append(x)
         offset += x
-        full_ranking += ranking
-        if show_xs:
-            best_xs.append(x)
+        keep = np.ones(remaining.shape[0], dtype=bool)
+        keep[picked] = False
+        remaining = remaining[keep]
 
-    if show_xs:
-        return full_ranking, best_xs
+    if ranked:
+        return np.concatenate(ranked), best_xs
+
+    return np.zeros(0, dtype=np.intp), best_xs
+
+
+def best_x_sweep(products: Union[Dict, Products], g: DistributionLike,
+                 capacities: List[int], show_xs: bool = False) -> Dict:
+    """best_x_full_capacity for many capacities at once.
+
+    H[0, k] does not depend on the capacity the table is solved for, so
+    a round solved for the largest capacity also serves every smaller
+    one: the best x of each capacity is chosen over the prefix of its
+    attention spans. Capacities choosing the same x share the round and
+    the following ones, a new table is only solved when their choices
+    differ, which mostly happens in the last rounds of the smaller
+    capacities.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products, keys must be the product ids and values
+            must be dictionaries with the revenue and probability of
+            each product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacities: list
+            Capacities to be ranked for.
+        show_xs: bool, optional, default: False
+            Should the function return the list of "best-x"'s chosen
+            for each capacity?
+
+    Returns
+    -------
+        rankings: dict
+            The ranking of best_x_full_capacity for each capacity, or a
+            tuple with the ranking and the xs' values if show_xs.
+    """
+
+    prods = as_products(products)
+    order = prods.key_order()
+    results = sweep_positions(prods.revenue[order], prods.probability[order],
+                              g, capacities)
+    rankings = {}
+    for capacity, (positions, best_xs) in results.items():
+        ranking = match_format(prods.take(order[positions]), products)
+        rankings[capacity] = (ranking, best_xs) if show_xs else ranking
+
+    return rankings
+
+
+def sweep_positions(revenue: np.ndarray, probability: np.ndarray,
+                    g: DistributionLike, capacities: List[int]) -> Dict:
+    """best_x_sweep on arrays of products.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacities: list
+            Capacities to be ranked for.
+
+    Returns
+    -------
+        results: dict
+            For each capacity, the positions of the ranked products in
+            ranking order and the list of xs' values chosen, as
+            returned by full_capacity_positions.
+    """
+
+    n_products = revenue.shape[0]
+    # Capacities above the number of products rank all of them.
+    targets = {capacity: max(min(capacity, n_products), 0)
+               for capacity in capacities}
+    # Every round evaluates a prefix of G, computed once for the largest.
+    survival(g, max(targets.values(), default=0))
+
+    finished = {}
+    branches = [(np.arange(n_products), 0, [], [],
+                 sorted(set(targets.values())))]
+    while branches:
+        remaining, offset, ranked, best_xs, group = branches.pop()
+        active = [target for target in group if target > offset]
+        for target in group:
+            if target <= offset:
+                finished[target] = ranked, best_xs
+        if not active:
+            continue
+
+        profiling.best_x_round(remaining.shape[0])
+        revenue_, probability_ = revenue[remaining], probability[remaining]
+        h, choice = dp_table(revenue_, probability_, active[-1] - offset)
+        choices = {}
+        for target in active:
+            x = choose_x(h[:target - offset + 1], g, offset)
+            choices.setdefault(x, []).append(target)
+
+        for x, targets_ in choices.items():
+            if x == 0:
+                for target in targets_:
+                    finished[target] = ranked, best_xs
+                continue
+
+            with profiling.stage("backtrack"):
+                picked = backtrack(choice, x)
+                positions = remaining[ranking_order(picked, revenue_,
+                                                    probability_)]
+            keep = np.ones(remaining.shape[0], dtype=bool)
+            keep[picked] = False
+            branches.append((remaining[keep], offset + x,
+                             ranked + [positions], best_xs + [x],
+                             targets_))
+
+    results = {}
+    for capacity, target in targets.items():
+        ranked, best_xs = finished[target]
+        positions = np.concatenate(ranked) if ranked \
+            else np.zeros(0, dtype=np.intp)
+        results[capacity] = positions, list(best_xs)
+
+    return results
+
+
+def table_rounds(table: FixedAttentionTable, g: DistributionLike,
+                 capacity: int) -> Tuple[np.ndarray, List]:
+    """The best-x rounds up to full capacity over a solved table.
+
+    Ranked products are removed from the table at the end of every
+    round, so the table is modified.
+
+    Parameters
+    ----------
+        table: FixedAttentionTable
+            Table of the products, all of them active.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+
+    Returns
+    -------
+        positions, best_xs: tuple[numpy.ndarray, list]
+            Positions (rows of the table) of the ranked products, in
+            ranking order, and the list of xs' values chosen.
+    """
+
+    n_items_to_rank = min(table.revenue.shape[0], capacity)
+    table.capacity = min(table.capacity, n_items_to_rank)
+    offset = 0
+    ranked = []
+    best_xs = []
+    while n_items_to_rank > offset:
+        profiling.best_x_round(table.revenue.shape[0] - offset)
+        x = choose_x(table.revenues, g, offset)
+        if x == 0:
+            break
+
+        with profiling.stage("backtrack"):
+            picked = table.assortment(x)
+            ranked.append(ranking_order(picked, table.revenue,
+                                        table.probability))
+        best_xs.append(x)
+        offset += x
+        table.remove(picked, capacity=n_items_to_rank - offset)
+
+    if ranked:
+        return np.concatenate(ranked), best_xs
+
+    return np.zeros(0, dtype=np.intp), best_xs
+
+
+def unbounded_revenue(revenue: np.ndarray, probability: np.ndarray) -> float:
+    """Optimal revenue of the fixed attention problem without capacity.
+
+    It is an upper bound of H(x) for every attention span x.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+
+    Returns
+    -------
+        revenue: float
+            The optimal revenue.
+    """
+
+    value = 0.0
+    for rev, prob in zip(revenue[::-1].tolist(), probability[::-1].tolist()):
+        if rev > value:
+            value += prob * (rev - value)
+
+    return value
+
+
+def approximate_round(revenue: np.ndarray, probability: np.ndarray,
+                      g: DistributionLike, capacity: int, offset: int,
+                      epsilon: float) -> Tuple[int, np.ndarray, float]:
+    """A best-x round over bounded attention spans with a certified gap.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        offset: int
+            An offset to be used when calling the distribution g.
+        epsilon: float
+            Tolerance of the approximation.
+
+    Returns
+    -------
+        best_x_value, positions, gap: tuple[int, numpy.ndarray, float]
+            The x chosen, positions of the ranked products in ranking
+            order and an upper bound on how much larger the exact
+            best-x objective is.
+    """
+
+    capacity = min(revenue.shape[0], capacity)
+    if capacity < 1:
+        return 0, np.zeros(0, dtype=np.intp), 0.0
+
+    ceiling = unbounded_revenue(revenue, probability)
+    attention = survival(g, capacity + offset)[offset:]
+    bound = min(capacity, INITIAL_BOUND)
+    while True:
+        # Products dominated by bound others are not needed up to bound.
+        kept = np.flatnonzero(~dominated(revenue, probability, bound))
+        h, choice = dp_table(revenue[kept], probability[kept], bound)
+        best = float(np.max(h[1:] * attention[:bound]))
+        # Every x beyond the bound has H(x) * G(x) <= ceiling * G(x).
+        outside = ceiling * attention[bound] if bound < capacity else 0.0
+        if outside <= (1.0 + epsilon) * best:
+            break
+        bound = min(2 * bound, capacity)
+
+    best_x_value = choose_x(h, g, offset)
+    with profiling.stage("backtrack"):
+        picked = kept[backtrack(choice, best_x_value)]
+        positions = ranking_order(picked, revenue, probability)
+    return best_x_value, positions, max(outside - best, 0.0)
+
+
+def approximate_positions(revenue: np.ndarray, probability: np.ndarray,
+                          g: DistributionLike, capacity: int,
+                          epsilon: float) -> Tuple[np.ndarray, List, List]:
+    """best_x_full_capacity over bounded attention spans.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        epsilon: float
+            Tolerance of the approximation.
+
+    Returns
+    -------
+        positions, best_xs, gaps: tuple[numpy.ndarray, list, list]
+            Positions in the input arrays of the ranked products, in
+            ranking order, the list of xs' values chosen and the
+            certified gap of every round.
+    """
+
+    n_items_to_rank = min(revenue.shape[0], capacity)
+    # Dominated products are never needed, in any round.
+    remaining = np.flatnonzero(~dominated(revenue, probability,
+                                          n_items_to_rank))
+    offset = 0
+    ranked = []
+    best_xs = []
+    gaps = []
+    while n_items_to_rank > offset:
+        profiling.best_x_round(remaining.shape[0])
+        x, picked, gap = approximate_round(revenue[remaining],
+                                           probability[remaining], g,
+                                           n_items_to_rank - offset, offset,
+                                           epsilon)
+        if x == 0:
+            break
+
+        ranked.append(remaining[picked])
+        best_xs.append(x)
+        gaps.append(gap)
+        offset += x
+        keep = np.ones(remaining.shape[0], dtype=bool)
+        keep[picked] = False
+        remaining = remaining[keep]
+
+    if ranked:
+        return np.concatenate(ranked), best_xs, gaps
 
-    return full_ranking
+    return np.zeros(0, dtype=np.intp), best_xs, gaps
@@ -0,0 +1,232 @@
+"""Memoization of rankings.
+
+When the same set of products is ranked again and again with the same
+distribution of attention spans (for instance by an online service
+where candidate sets change far less often than requests arrive), the
+best-x ranking can be computed once and reused.
+
+A RankingCache keys rankings by a hash of the content of the products
+(ids, revenues and probabilities), the capacity, the distribution of
+attention spans and the options of the algorithm. Entries are evicted
+when the cache is full (least recently used first) or after a time to
+live.
+
+Classes
+-------
+    RankingCache:
+        A bounded cache of best-x rankings.
+
+Functions
+---------
+    fingerprint:
+        A fast hash of the content of a set of products.
+"""
+
+import time
+import pickle
+import hashlib
+import numpy as np
+from threading import Lock
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Hashable, List, Tuple, Union
+from revenue_maximization_ranking.cascade.attention import distribution_key
+from revenue_maximization_ranking.cascade\
+                                 .best_x import full_capacity_positions
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["RankingCache", "fingerprint"]
+
+CacheStats = namedtuple("CacheStats", ["hits", "misses", "evictions",
+                                       "expirations", "maxsize", "currsize"])
+
+
+def fingerprint(products: Products) -> bytes:
+    """A fast hash of the content of a set of products.
+
+    Parameters
+    ----------
+        products: Products
+            Set of products.
+
+    Returns
+    -------
+        digest: bytes
+            BLAKE2b digest of the ids, revenues and probabilities.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    if products.ids.dtype == object:
+        digest.update(pickle.dumps(products.ids.tolist(), protocol=4))
+    else:
+        digest.update(products.ids.dtype.str.encode())
+        digest.update(np.ascontiguousarray(products.ids).tobytes())
+    digest.update(np.ascontiguousarray(products.revenue).tobytes())
+    digest.update(np.ascontiguousarray(products.probability).tobytes())
+    return digest.digest()
+
+
+def _g_key(g: DistributionLike) -> Hashable:
+    """A hashable key of a distribution or array of probabilities."""
+    if isinstance(g, np.ndarray):
+        return "array", hashlib.blake2b(
+            np.ascontiguousarray(g, dtype=np.float64).tobytes(),
+            digest_size=16).digest()
+
+    return distribution_key(g)
+
+
+class RankingCache:
+    """A bounded cache of best-x rankings.
+
+    Parameters
+    ----------
+        maxsize: int, default 1024
+            Maximum number of cached rankings.
+        ttl: optional, float
+            Time to live of the entries in seconds, by default they do
+            not expire.
+        clock: Callable, default time.monotonic
+            Function returning the current time in seconds.
+
+    Attributes
+    ----------
+        hits, misses, evictions, expirations: int
+            Counters of the cache activity.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> CacheStats:
+        """Counters and size of the cache."""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              self.expirations, self.maxsize,
+                              len(self._entries))
+
+    def clear(self):
+        """It removes every entry, counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None \
+                    and self.clock() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def positions(self, products: Products, g: DistributionLike,
+                  capacity: int, incremental: bool = False,
+                  prune: bool = False) -> Tuple[np.ndarray, List]:
+        """Cached positions of the best-x ranking of some products.
+
+        Parameters
+        ----------
+            products: Products
+                Set of products.
+            g: DistributionLike
+                Distribution of attention spans, an array of attention
+                probabilities is also accepted.
+            capacity: int
+                Maximum number of items that the retailer can display.
+            incremental, prune: bool, optional, default: False
+                See best_x.best_x_full_capacity.
+
+        Returns
+        -------
+            positions, best_xs: tuple[numpy.ndarray, list]
+                Positions of the ranked products in products, in
+                ranking order, and the list of xs' values chosen.
+        """
+
+        key = (fingerprint(products), int(capacity), _g_key(g), prune)
+        value = self._get(key)
+        if value is None:
+            order = products.key_order()
+            positions, best_xs = full_capacity_positions(
+                products.revenue[order], products.probability[order], g,
+                capacity, incremental=incremental, prune=prune)
+            positions = order[positions]
+            positions.flags.writeable = False
+            # A reference to g keeps id based distribution keys valid.
+            value = (positions, tuple(best_xs), g)
+            self._put(key, value)
+
+        return value[0], list(value[1])
+
+    def best_x_full_capacity(self, products: Union[Dict, Products],
+                             g: DistributionLike, capacity: int,
+                             show_xs: bool = True, incremental: bool = False,
+                             prune: bool = False) -> Union[List, Products,
+                                                           Tuple]:
+        """Cached version of best_x.best_x_full_capacity.
+
+        Same parameters and returns as best_x.best_x_full_capacity.
+        """
+
+        prods = as_products(products)
+        positions, best_xs = self.positions(prods, g, capacity,
+                                            incremental=incremental,
+                                            prune=prune)
+        full_ranking = match_format(prods.take(positions), products)
+        if show_xs:
+            return full_ranking, best_xs
+
+        return full_ranking
+
+    def full_best_x(self, df, revenue_col: str, probability_col: str,
+                    g: DistributionLike, capacity: int = 0,
+                    show_xs: bool = False, prune: bool = False):
+        """Cached version of dataframe.full_best_x.
+
+        Same parameters and returns as dataframe.full_best_x.
+        """
+
+        # Imported here so the cache does not require pandas.
+        from revenue_maximization_ranking.cascade\
+            .dataframe import ranking_as_column
+
+        if capacity < 1:
+            capacity = df.shape[0]
+
+        products = Products.from_dataframe(df, revenue_col, probability_col)
+        positions, best_xs = self.positions(products, g, capacity,
+                                            prune=prune)
+        rank_column = ranking_as_column(products.take(positions))
+        if show_xs:
+            return rank_column, best_xs
+
+        return rank_column
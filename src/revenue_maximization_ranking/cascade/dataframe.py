@@ -8,18 +8,37 @@ Functions
 ---------
     full_best_x:
         Implements the full_best_x ranking on a dataframe.
+    full_best_x_grouped:
+        Implements the full_best_x ranking for every group of a
+        dataframe.
+    full_best_x_sweep:
+        Implements the full_best_x ranking for many capacities at once.
     expected_revenue:
         It calculates the expected revenue for the cascade model.
+    expected_revenue_grouped:
+        It calculates the expected revenue of every group of a
+        dataframe.
+    expected_revenue_matrix:
+        It calculates the expected revenue of many rankings under many
+        distributions of attention spans.
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Union, Tuple
-from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from typing import Dict, List, Sequence, Union, Tuple
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking.cascade.best_x import \
+    best_x_full_capacity, sweep_positions
+from revenue_maximization_ranking.cascade.parallel import rank_many
+from revenue_maximization_ranking.cascade.products import Products
 from revenue_maximization_ranking.cascade\
-                                 .revenue import expected_revenue as exp_rev
+                                 .revenue import expected_revenues, \
+                                                 revenue_matrix
 from revenue_maximization_ranking._types import DistributionLike
 
-__all__ = ["full_best_x", "expected_revenue"]
+__all__ = ["full_best_x", "full_best_x_grouped", "full_best_x_sweep",
+           "expected_revenue", "expected_revenue_grouped",
+           "expected_revenue_matrix"]
 
 
 def load_dataframe(df: pd.DataFrame, revenue_col: str,
@@ -52,12 +71,12 @@ def load_dataframe(df: pd.DataFrame, revenue_col: str,
     return products
 
 
-def ranking_as_column(ranking: List) -> pd.Series:
+def ranking_as_column(ranking: Union[List, Products]) -> pd.Series:
     """It converts a ranking list in a pandas.Series.
 
     Parameters
     ----------
-        ranking: List
+        ranking: List or Products
             A list of tuples representing products, the first element
             of each tuple will be the product id and the second element
             must be a dictionary with the revenue and probability of
@@ -70,15 +89,19 @@ def ranking_as_column(ranking: List) -> pd.Series:
             corresponding ranking (1, 2, 3, ...) of each product.
     """
 
-    index = [name for name, _ in ranking]
-    rank_column = pd.Series([i + 1 for i in range(len(index))], index=index)
+    if isinstance(ranking, Products):
+        index = ranking.ids
+    else:
+        index = [name for name, _ in ranking]
+    rank_column = pd.Series(np.arange(1, len(index) + 1), index=index)
     return rank_column
 
 
 def full_best_x(df: pd.DataFrame, revenue_col: str, probability_col: str,
                 g: DistributionLike, capacity: int = 0,
-                show_xs: bool = False) -> Union[pd.Series,
-                                                Tuple[pd.Series, List]]:
+                show_xs: bool = False, prune: bool = False,
+                epsilon: float = 0.0,
+                show_gap: bool = False) -> Union[pd.Series, Tuple]:
     """Implements the full_best_x ranking on a dataframe.
 
     Parameters
@@ -91,11 +114,22 @@ def full_best_x(df: pd.DataFrame, revenue_col: str, probability_col: str,
             Name of the column with the conditional probability of each
             product.
         g: DistributionLike
-            Distribution of attention spans.
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
         capacity: int, default 0
             Maximum number of products that the retailer can display.
         show_xs: bool, default False
             List of xs' values chosen by the algorithm.
+        prune: bool, default False
+            Should products dominated by at least capacity others be
+            discarded before solving? See
+            fixed_attention.dominance_filter.
+        epsilon: float, default 0.0
+            If positive the faster approximate mode is used, see
+            best_x.best_x_full_capacity.
+        show_gap: bool, default False
+            Certified gap of every round, see
+            best_x.best_x_full_capacity.
 
     Returns
     -------
@@ -104,19 +138,173 @@ def full_best_x(df: pd.DataFrame, revenue_col: str, probability_col: str,
             will be the same as the df index.
         best_xs: list, optional
             List of xs' values chosen by the algorithm.
+        gaps: list, optional
+            Certified gap of every round.
     """
 
     if capacity < 1:
         capacity = df.shape[0]
 
-    products = load_dataframe(df, revenue_col, probability_col)
-    algorithm = best_x_full_capacity(products, g, capacity, show_xs=show_xs)
+    with profiling.stage("load"):
+        products = Products.from_dataframe(df, revenue_col, probability_col)
+    algorithm = best_x_full_capacity(products, g, capacity, show_xs=show_xs,
+                                     prune=prune, epsilon=epsilon,
+                                     show_gap=show_gap)
+    with profiling.stage("output"):
+        if show_xs or show_gap:
+            return (ranking_as_column(algorithm[0]),) + algorithm[1:]
+
+        return ranking_as_column(algorithm)
+
+
+def full_best_x_sweep(df: pd.DataFrame, revenue_col: str,
+                      probability_col: str, g: DistributionLike,
+                      capacities: List[int]) -> Tuple[pd.DataFrame,
+                                                      pd.Series]:
+    """Implements the full_best_x ranking for many capacities at once.
+
+    The rounds are shared between capacities as long as they choose
+    the same x (see best_x.best_x_sweep), so the cost is close to the
+    one of the largest capacity alone.
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+            Dataframe storing the products' data.
+        revenue_col: str
+            Name of the column with the revenue of each product.
+        probability_col: str
+            Name of the column with the conditional probability of each
+            product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacities: list
+            Capacities to be ranked for, as the capacity of
+            full_best_x.
+
+    Returns
+    -------
+        rank_columns: pandas.DataFrame
+            The ranking of each product (NaN if left out) for each
+            capacity, with the capacities as columns and the same index
+            as df.
+        revenues: pandas.Series
+            Expected revenue of the ranking of each capacity.
+    """
+
+    with profiling.stage("load"):
+        revenue = df[revenue_col].to_numpy(dtype=np.float64)
+        probability = df[probability_col].to_numpy(dtype=np.float64)
+        order = np.lexsort((-probability, -revenue))
+    targets = [capacity if capacity >= 1 else df.shape[0]
+               for capacity in capacities]
+    results = sweep_positions(revenue[order], probability[order], g, targets)
+
+    with profiling.stage("output"):
+        ranks = np.full((df.shape[0], len(capacities)), np.nan)
+        width = max((positions.shape[0] for positions, _ in results.values()),
+                    default=0)
+        ranked_revenue = np.zeros((len(capacities), width))
+        ranked_probability = np.zeros((len(capacities), width))
+        for k, target in enumerate(targets):
+            rows = order[results[target][0]]
+            ranks[rows, k] = np.arange(1, rows.shape[0] + 1)
+            ranked_revenue[k, :rows.shape[0]] = revenue[rows]
+            ranked_probability[k, :rows.shape[0]] = probability[rows]
+
+        rank_columns = pd.DataFrame(ranks, index=df.index,
+                                    columns=list(capacities))
+        revenues = pd.Series(expected_revenues(ranked_revenue,
+                                               ranked_probability, g),
+                             index=list(capacities))
+    return rank_columns, revenues
+
+
+def full_best_x_grouped(df: pd.DataFrame, group_col: Union[str, List],
+                        revenue_col: str, probability_col: str,
+                        g: DistributionLike, capacity: int = 0,
+                        show_xs: bool = False,
+                        workers: int = 1) -> Union[pd.Series,
+                                                   Tuple[pd.Series, Dict]]:
+    """Implements the full_best_x ranking for every group of a dataframe.
+
+    Each group (for instance a search) is ranked on its own, as if
+    full_best_x was called on it. The whole dataframe is sorted only
+    once and the groups are ranked straight from numpy arrays, so no
+    dictionary of products is built. Groups can be ranked in parallel
+    by a pool of processes (see parallel.rank_many).
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+            Dataframe storing the products' data.
+        group_col: str or list
+            Name of the column (or columns) identifying each group.
+        revenue_col: str
+            Name of the column with the revenue of each product.
+        probability_col: str
+            Name of the column with the conditional probability of each
+            product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int, default 0
+            Maximum number of products that the retailer can display
+            for each group, if lower than 1 the size of the group is
+            used.
+        show_xs: bool, default False
+            List of xs' values chosen by the algorithm.
+        workers: optional, int, default 1
+            Number of worker processes, None for the number of
+            processors.
+
+    Returns
+    -------
+        rank_column: pandas.Series
+            A pandas series with the ranking of each product within its
+            group, aligned to the df index. Products left out of the
+            ranking (and rows without group) get NaN.
+        best_xs: dict, optional
+            Lists of xs' values chosen by the algorithm, keys are the
+            groups.
+    """
+
+    with profiling.stage("load"):
+        codes = df.groupby(group_col, sort=False).ngroup().fillna(-1)\
+            .to_numpy(dtype=np.intp)
+        revenue = df[revenue_col].to_numpy(dtype=np.float64)
+        probability = df[probability_col].to_numpy(dtype=np.float64)
+        order = np.lexsort((-probability, -revenue, codes))
+        order = order[codes[order] >= 0]
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [order.shape[0]]))
+
+        group_rows = [order[start:end]
+                      for start, end in zip(starts, ends) if start < end]
+    profiling.count("groups", len(group_rows))
+    results = rank_many([(revenue[rows], probability[rows])
+                         for rows in group_rows],
+                        g, capacity=capacity, workers=workers)
+
+    with profiling.stage("output"):
+        ranks = np.full(df.shape[0], np.nan)
+        best_xs = {}
+        groups = df[group_col]
+        for rows, (positions, xs) in zip(group_rows, results):
+            ranks[rows[positions]] = np.arange(1, positions.shape[0] + 1)
+            if show_xs:
+                group = groups.iloc[rows[0]]
+                if isinstance(group, pd.Series):
+                    group = tuple(group)
+                best_xs[group] = xs
+
+        rank_column = pd.Series(ranks, index=df.index)
     if show_xs:
-        rank_column = ranking_as_column(algorithm[0])
-        best_xs = algorithm[1]
         return rank_column, best_xs
 
-    return ranking_as_column(algorithm)
+    return rank_column
 
 
 def expected_revenue(df: pd.DataFrame, revenue_col: str, probability_col: str,
@@ -133,7 +321,8 @@ def expected_revenue(df: pd.DataFrame, revenue_col: str, probability_col: str,
             Name of the column with the conditional probability of each
             product.
         g: DistributionLike
-            Distribution of attention spans.
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
         ranking_col: str
             Name of the columns with the ranking to be evaluated.
 
@@ -144,11 +333,124 @@ def expected_revenue(df: pd.DataFrame, revenue_col: str, probability_col: str,
             cascade model.
     """
 
-    df_ = df[[revenue_col, probability_col, ranking_col]].copy()
-    df_.query(f"{ranking_col}.notna()", inplace=True)
-    df_.rename(columns={revenue_col: "revenue",
-                        probability_col: "probability"}, inplace=True)
-    df_.sort_values(by=ranking_col, inplace=True)
-    df_.drop(columns=ranking_col, inplace=True)
-    revenue = exp_rev(ranked_products=df_.iterrows(), g=g)
-    return revenue
+    rank = df[ranking_col].to_numpy(dtype=np.float64)
+    rows = np.flatnonzero(~np.isnan(rank))
+    rows = rows[np.argsort(rank[rows], kind="stable")]
+    revenue = df[revenue_col].to_numpy(dtype=np.float64)[rows]
+    probability = df[probability_col].to_numpy(dtype=np.float64)[rows]
+    return float(expected_revenues(revenue, probability, g))
+
+
+def expected_revenue_grouped(df: pd.DataFrame, group_col: Union[str, List],
+                             revenue_col: str, probability_col: str,
+                             ranking_col: str,
+                             g: DistributionLike) -> pd.Series:
+    """It calculates the expected revenue of every group of a dataframe.
+
+    The ranking of each group (for instance a search) is evaluated on
+    its own, as if expected_revenue was called on it. Rankings are
+    padded to a common length and evaluated all at once by
+    revenue.expected_revenues.
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+            Dataframe storing the products' data.
+        group_col: str or list
+            Name of the column (or columns) identifying each group.
+        revenue_col: str
+            Name of the column with the revenue of each product.
+        probability_col: str
+            Name of the column with the conditional probability of each
+            product.
+        ranking_col: str
+            Name of the columns with the ranking to be evaluated, as
+            returned by full_best_x_grouped.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+
+    Returns
+    -------
+        revenues: pandas.Series
+            Expected revenue of each group, indexed by the groups.
+    """
+
+    codes = df.groupby(group_col, sort=False).ngroup().fillna(-1)\
+        .to_numpy(dtype=np.intp)
+    rank = df[ranking_col].to_numpy(dtype=np.float64)
+    n_groups = int(codes.max()) + 1 if codes.shape[0] else 0
+    _, first_rows = np.unique(codes, return_index=True)
+    first_rows = first_rows[codes[first_rows] >= 0]
+
+    rows = np.flatnonzero(~np.isnan(rank) & (codes >= 0))
+    rows = rows[np.lexsort((rank[rows], codes[rows]))]
+    counts = np.bincount(codes[rows], minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    slots = np.arange(rows.shape[0]) - starts[codes[rows]]
+
+    width = int(counts.max()) if n_groups else 0
+    revenue = np.zeros((n_groups, width))
+    probability = np.zeros((n_groups, width))
+    revenue[codes[rows], slots] = df[revenue_col].to_numpy(
+        dtype=np.float64)[rows]
+    probability[codes[rows], slots] = df[probability_col].to_numpy(
+        dtype=np.float64)[rows]
+
+    groups = df[group_col].iloc[first_rows]
+    if isinstance(groups, pd.DataFrame):
+        index = pd.MultiIndex.from_frame(groups)
+    else:
+        index = pd.Index(groups)
+    return pd.Series(expected_revenues(revenue, probability, g), index=index)
+
+
+def expected_revenue_matrix(df: pd.DataFrame, revenue_col: str,
+                            probability_col: str, ranking_cols: List[str],
+                            gs: Union[Sequence, np.ndarray],
+                            names: List = None) -> pd.DataFrame:
+    """It calculates the expected revenue of many rankings under many
+    distributions of attention spans.
+
+    Every ranking is evaluated as by expected_revenue, all of them
+    under all the distributions in one call to revenue.revenue_matrix.
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+            Dataframe storing the products' data.
+        revenue_col: str
+            Name of the column with the revenue of each product.
+        probability_col: str
+            Name of the column with the conditional probability of each
+            product.
+        ranking_cols: list
+            Names of the columns with the rankings to be evaluated.
+        gs: sequence or numpy.ndarray
+            Distributions of attention spans or a two dimensional
+            array of survival vectors (see attention.survival_stack).
+        names: optional, list
+            Names of the distributions, by default their positions.
+
+    Returns
+    -------
+        revenues: pandas.DataFrame
+            Expected revenue of each ranking (rows, indexed by the
+            ranking columns) under each distribution (columns).
+    """
+
+    ranks = df[list(ranking_cols)].to_numpy(dtype=np.float64)
+    revenue_ = df[revenue_col].to_numpy(dtype=np.float64)
+    probability_ = df[probability_col].to_numpy(dtype=np.float64)
+    ranked = ~np.isnan(ranks)
+    width = int(ranked.sum(axis=0).max()) if ranks.size else 0
+    revenue = np.zeros((ranks.shape[1], width))
+    probability = np.zeros((ranks.shape[1], width))
+    for k in range(ranks.shape[1]):
+        rows = np.flatnonzero(ranked[:, k])
+        rows = rows[np.argsort(ranks[rows, k], kind="stable")]
+        revenue[k, :rows.shape[0]] = revenue_[rows]
+        probability[k, :rows.shape[0]] = probability_[rows]
+
+    return pd.DataFrame(revenue_matrix(revenue, probability, gs),
+                        index=list(ranking_cols), columns=names)
@@ -17,13 +17,29 @@ Functions
 ---------
     optimal_rankings:
         Optimal rankings for the fixed attention span problem.
+    fast_optimal_rankings:
+        Array-backed version of optimal_rankings.
+    dominance_filter:
+        It discards products that can not be in an optimal assortment.
+
+Classes
+-------
+    FixedAttentionTable:
+        Full dynamic programming table that supports removing products.
 """
 
+import heapq
+import numpy as np
 from copy import copy
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Union
 from collections import defaultdict
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
 
-__all__ = ["optimal_rankings"]
+__all__ = ["optimal_rankings", "fast_optimal_rankings", "dominance_filter",
+           "FixedAttentionTable"]
 
 
 def key(product_: Tuple[str, Dict]) -> Tuple[float, float]:
@@ -51,7 +67,8 @@ def key(product_: Tuple[str, Dict]) -> Tuple[float, float]:
     return product_[1]["revenue"], product_[1]["probability"]
 
 
-def optimal_rankings(products: Dict, capacity: int) -> Tuple[Dict, Dict]:
+def optimal_rankings(products: Union[Dict, Products],
+                     capacity: int) -> Tuple[Dict, Dict]:
     """Optimal rankings for the fixed attention span problem.
 
     Given a set of products this function calculates a solution for
@@ -62,9 +79,11 @@ def optimal_rankings(products: Dict, capacity: int) -> Tuple[Dict, Dict]:
     https://arxiv.org/abs/2012.03800, but returns all of H[0, k]
     elements to avoid the need for the "AssortOpt" algorithm.
 
+    Products given as Products are solved by fast_optimal_rankings.
+
     Parameters
     ----------
-        products: dict
+        products: dict or Products
             Dictionary with all the products, keys must be the products
             ids and values must be dictionaries with the revenue and
             probability of each product.
@@ -78,6 +97,9 @@ def optimal_rankings(products: Dict, capacity: int) -> Tuple[Dict, Dict]:
         attention span is the key on those dictionaries.
     """
 
+    if isinstance(products, Products):
+        return fast_optimal_rankings(products, capacity)
+
     h = defaultdict(lambda: 0.0)
     assort = defaultdict(lambda: [])
 
@@ -103,3 +125,489 @@ def optimal_rankings(products: Dict, capacity: int) -> Tuple[Dict, Dict]:
     revenues = {k: h[0, k] for k in range(1, min(len(products), capacity) + 1)}
 
     return rankings, revenues
+
+
+def dp_table(revenue: np.ndarray, probability: np.ndarray,
+             capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fills the fixed attention dynamic programming table.
+
+    This is the recursion of optimal_rankings computed one row at a
+    time, every row holds all the attention spans 0, 1, ..., capacity
+    so only the last row of H is kept in memory. Decisions are stored
+    in a boolean matrix instead of copying the assortments.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        capacity: int
+            Maximum attention span to be solved.
+
+    Returns
+    -------
+        h, choice: tuple[ndarray, ndarray]
+            h[k] is the optimal revenue for attention span k, that is
+            H[0, k]. choice[j, k] is True when product j is added to
+            the assortment at cell (j, k) of the table.
+    """
+
+    n_products = revenue.shape[0]
+    profiling.count("dp_cells", n_products * capacity)
+    choice = np.zeros((n_products, capacity + 1), dtype=bool)
+    h = np.zeros(capacity + 1, dtype=np.float64)
+    with profiling.stage("dp"):
+        for j in range(n_products - 1, -1, -1):
+            alternative = h[:-1] + probability[j] * (revenue[j] - h[:-1])
+            take = alternative >= h[1:]
+            choice[j, 1:] = take
+            h[1:] = np.where(take, alternative, h[1:])
+
+    return h, choice
+
+
+def backtrack(choice: np.ndarray, k: int) -> np.ndarray:
+    """It rebuilds the optimal assortment for attention span k.
+
+    Parameters
+    ----------
+        choice: numpy.ndarray
+            Decision matrix as returned by dp_table.
+        k: int
+            Attention span.
+
+    Returns
+    -------
+        picked: numpy.ndarray
+            Positions (rows of choice) of the products in the optimal
+            assortment, in increasing order.
+    """
+
+    picked = []
+    j = 0
+    n_products = choice.shape[0]
+    while k > 0 and j < n_products:
+        j += int(np.argmax(choice[j:, k]))
+        if not choice[j, k]:
+            break
+        picked.append(j)
+        j += 1
+        k -= 1
+
+    return np.array(picked, dtype=np.intp)
+
+
+def backtrack_all(choice: np.ndarray) -> np.ndarray:
+    """It rebuilds the optimal assortments for every attention span.
+
+    All the paths through the decision matrix are followed at once, so
+    the cost is one vectorized step per product.
+
+    Parameters
+    ----------
+        choice: numpy.ndarray
+            Decision matrix as returned by dp_table.
+
+    Returns
+    -------
+        members: numpy.ndarray
+            Boolean matrix shaped like choice, members[j, k] is True
+            when product j belongs to the optimal assortment for
+            attention span k.
+    """
+
+    members = np.zeros_like(choice)
+    slots = np.arange(choice.shape[1])
+    for j in range(choice.shape[0]):
+        taken = choice[j, slots] & (slots > 0)
+        members[j] = taken
+        slots -= taken
+
+    return members
+
+
+def ranking_order(picked: np.ndarray, revenue: np.ndarray,
+                  probability: np.ndarray) -> np.ndarray:
+    """It sorts an assortment the way optimal_rankings does.
+
+    Products with equal key are left in the order in which the
+    reference implementation appends them to the assortment.
+
+    Parameters
+    ----------
+        picked: numpy.ndarray
+            Positions of the products, as returned by backtrack.
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+
+    Returns
+    -------
+        order: numpy.ndarray
+            The positions in picked, ranked.
+    """
+
+    picked = picked[::-1]
+    return picked[np.lexsort((-probability[picked], -revenue[picked]))]
+
+
+def fast_optimal_rankings(products: Union[Dict, Products],
+                          capacity: int) -> Tuple[Dict, Dict]:
+    """Array-backed version of optimal_rankings.
+
+    Products are sorted once, H is filled with numpy one row at a time
+    and the rankings are rebuilt by backtracking over a boolean
+    decision matrix. It returns exactly the same as optimal_rankings,
+    which is kept as the reference implementation.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Dictionary with all the products, keys must be the products
+            ids and values must be dictionaries with the revenue and
+            probability of each product.
+        capacity: int
+            Maximum capacity of items to be displayed by the retailer.
+
+    Returns
+    -------
+    rankings, revenues: Tuple[dict, dict]
+        Optimal rankings and its corresponding revenues. Each possible
+        attention span is the key on those dictionaries. Rankings are
+        Products when the products are given as Products.
+    """
+
+    prods = as_products(products)
+    prods = prods.take(prods.key_order())
+    max_k = min(len(prods), capacity)
+    h, choice = dp_table(prods.revenue, prods.probability, max_k)
+    members = backtrack_all(choice)
+    rankings = {k: match_format(prods.take(
+                    ranking_order(np.flatnonzero(members[:, k]),
+                                  prods.revenue, prods.probability)),
+                                products)
+                for k in range(1, max_k + 1)}
+    revenues = {k: float(h[k]) for k in range(1, max_k + 1)}
+
+    return rankings, revenues
+
+
+def dominated(revenue: np.ndarray, probability: np.ndarray,
+              capacity: int) -> np.ndarray:
+    """Products dominated by at least capacity other products.
+
+    Product j dominates product i when it comes before i in the Lemma 1
+    order, so r_j >= r_i, and p_j >= p_i. If i is in an assortment of
+    at most capacity products, some of its dominators is not, and
+    swapping i for it does not decrease the revenue: raising the
+    probability of a product never hurts when it is followed by
+    products with lower revenue, and raising its revenue never hurts.
+    So for every attention span up to capacity there is an optimal
+    assortment without dominated products.
+
+    This still holds after removing x ranked products and reducing the
+    capacity to capacity - x, as best_x_full_capacity does, and it
+    holds among the non dominated products only, since the first
+    dominated dominator of a product brings its own capacity
+    dominators, which dominate that product too.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        capacity: int
+            Maximum attention span to be solved.
+
+    Returns
+    -------
+        mask: numpy.ndarray
+            Boolean array, True for the dominated products.
+    """
+
+    mask = np.zeros(revenue.shape[0], dtype=bool)
+    if capacity < 1:
+        return mask
+
+    with profiling.stage("prune"):
+        _mark_dominated(mask, revenue, probability, capacity)
+
+    profiling.count("pruned", int(np.count_nonzero(mask)))
+    return mask
+
+
+def _mark_dominated(mask: np.ndarray, revenue: np.ndarray,
+                    probability: np.ndarray, capacity: int):
+    """It sets the mask of dominated for capacity >= 1."""
+
+    # Min-heap with the capacity largest probabilities seen so far.
+    heap = []
+    probabilities = probability.tolist()
+    for i in np.lexsort((-probability, -revenue)).tolist():
+        prob = probabilities[i]
+        if len(heap) < capacity:
+            heapq.heappush(heap, prob)
+        elif heap[0] >= prob:
+            mask[i] = True
+        else:
+            heapq.heapreplace(heap, prob)
+
+
+def dominance_filter(products: Union[Dict, Products],
+                     capacity: int) -> Tuple[Union[Dict, Products], int]:
+    """It discards products that can not be in an optimal assortment.
+
+    A product dominated (higher or equal revenue and probability) by at
+    least capacity other products is never needed by an optimal
+    assortment with up to capacity products, see dominated. Optimal
+    revenues are preserved for every attention span up to capacity,
+    although among rankings with the same revenue a different one may
+    be found.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Dictionary with all the products, keys must be the products
+            ids and values must be dictionaries with the revenue and
+            probability of each product.
+        capacity: int
+            Maximum capacity of items to be displayed by the retailer.
+
+    Returns
+    -------
+        kept, n_discarded: tuple
+            The remaining products, in the same format and order, and
+            the number of discarded products.
+    """
+
+    prods = as_products(products)
+    mask = dominated(prods.revenue, prods.probability, capacity)
+    n_discarded = int(np.count_nonzero(mask))
+    if isinstance(products, Products):
+        return products.take(np.flatnonzero(~mask)), n_discarded
+
+    kept = {name: product
+            for (name, product), discard in zip(products.items(), mask)
+            if not discard}
+    return kept, n_discarded
+
+
+class FixedAttentionTable:
+    """Full dynamic programming table that supports removing products.
+
+    Unlike dp_table every row of H is kept, so removing some products
+    only requires to recompute the rows above the last removed one.
+    Removed products are masked: their rows just copy the next row and
+    never take a decision. Columns above the current capacity are not
+    updated anymore once the capacity shrinks.
+
+    Products can also be inserted or deleted for good (see insert and
+    delete), which shifts the rows below them and recomputes the rows
+    above them, or moved to another row (see move).
+
+    This uses (n_products + 1) * (capacity + 1) floats of memory.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted by the Lemma 1 key in
+            decreasing order.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        capacity: int
+            Maximum attention span to be solved.
+
+    Attributes
+    ----------
+        h: numpy.ndarray
+            The H table, h[j, k] is the optimal revenue for attention
+            span k using products j, j + 1, ..., among the active ones.
+        choice: numpy.ndarray
+            Decision matrix, as in dp_table.
+        active: numpy.ndarray
+            Mask of the products that have not been removed.
+        capacity: int
+            Largest attention span for which the table is up to date.
+    """
+
+    def __init__(self, revenue: np.ndarray, probability: np.ndarray,
+                 capacity: int):
+        n_products = revenue.shape[0]
+        self.revenue = revenue
+        self.probability = probability
+        self.capacity = capacity
+        self.active = np.ones(n_products, dtype=bool)
+        self.h = np.zeros((n_products + 1, capacity + 1), dtype=np.float64)
+        self.choice = np.zeros((n_products, capacity + 1), dtype=bool)
+        self.refresh(n_products - 1)
+
+    @property
+    def revenues(self) -> np.ndarray:
+        """Optimal revenues H[0, k] for k = 0, 1, ..., capacity."""
+        return self.h[0, :self.capacity + 1]
+
+    def refresh(self, start: int, unchanged_below: int = 0):
+        """It recomputes the rows start, start - 1, ..., 0 of the table.
+
+        Row j only depends on row j + 1 and on product j. So, if the
+        products above some row did not change and that row turns out
+        equal to what it was, the rows above it are still up to date
+        and the update stops there.
+
+        Parameters
+        ----------
+            start: int
+                Last row to be recomputed.
+            unchanged_below: int, default 0
+                The rows (and products) above this one were not changed
+                since the table was last up to date, the update can
+                stop early at them.
+        """
+
+        with profiling.stage("dp"):
+            n_rows = self._refresh(start, unchanged_below)
+        profiling.count("dp_cells", n_rows * self.capacity)
+
+    def _refresh(self, start: int, unchanged_below: int) -> int:
+        """refresh, it returns the number of rows recomputed."""
+        width = self.capacity + 1
+        for j in range(start, -1, -1):
+            h_next = self.h[j + 1, :width]
+            if not self.active[j]:
+                converged = (j < unchanged_below
+                             and np.array_equal(self.h[j, :width], h_next))
+                self.h[j, :width] = h_next
+                self.choice[j, :width] = False
+            else:
+                alternative = h_next[:-1] + self.probability[j] * (
+                    self.revenue[j] - h_next[:-1])
+                take = alternative >= h_next[1:]
+                h_row = np.where(take, alternative, h_next[1:])
+                converged = (j < unchanged_below
+                             and np.array_equal(self.h[j, 1:width], h_row))
+                self.choice[j, 1:width] = take
+                self.h[j, 1:width] = h_row
+            if converged:
+                return start - j + 1
+
+        return start + 1
+
+    def assortment(self, k: int) -> np.ndarray:
+        """Positions of the optimal assortment for attention span k."""
+        return backtrack(self.choice[:, :self.capacity + 1], k)
+
+    def remove(self, positions: np.ndarray, capacity: int = None):
+        """It removes some products and updates the affected rows.
+
+        Parameters
+        ----------
+            positions: numpy.ndarray
+                Positions (rows) of the products to be removed.
+            capacity: optional, int
+                New capacity, it must not be greater than the current
+                one.
+        """
+
+        if capacity is not None:
+            self.capacity = min(self.capacity, capacity)
+        if len(positions) == 0:
+            return
+
+        self.active[positions] = False
+        self.refresh(int(np.max(positions)),
+                     unchanged_below=int(np.min(positions)))
+
+    def copy(self) -> "FixedAttentionTable":
+        """A copy of the table that can be modified independently."""
+        table = FixedAttentionTable.__new__(FixedAttentionTable)
+        table.revenue = self.revenue.copy()
+        table.probability = self.probability.copy()
+        table.capacity = self.capacity
+        table.active = self.active.copy()
+        table.h = self.h.copy()
+        table.choice = self.choice.copy()
+        return table
+
+    def insert(self, position: int, revenue: float, probability: float,
+               refresh: bool = True):
+        """It inserts a product in the table.
+
+        Parameters
+        ----------
+            position: int
+                Row of the new product, it must keep the products
+                sorted by the Lemma 1 key.
+            revenue: float
+                Revenue of the product.
+            probability: float
+                Probability of the product.
+            refresh: bool, default True
+                Should the rows up to position be recomputed?
+        """
+
+        self.revenue = np.insert(self.revenue, position, revenue)
+        self.probability = np.insert(self.probability, position, probability)
+        self.active = np.insert(self.active, position, True)
+        self.h = np.insert(self.h, position, 0.0, axis=0)
+        self.choice = np.insert(self.choice, position, False, axis=0)
+        if refresh:
+            self.refresh(position, unchanged_below=position)
+
+    def delete(self, position: int, refresh: bool = True):
+        """It deletes a product from the table.
+
+        Parameters
+        ----------
+            position: int
+                Row of the product.
+            refresh: bool, default True
+                Should the rows above position be recomputed?
+        """
+
+        self.revenue = np.delete(self.revenue, position)
+        self.probability = np.delete(self.probability, position)
+        self.active = np.delete(self.active, position)
+        self.h = np.delete(self.h, position, axis=0)
+        self.choice = np.delete(self.choice, position, axis=0)
+        if refresh:
+            self.refresh(position - 1, unchanged_below=position)
+
+    def move(self, old: int, new: int, revenue: float, probability: float,
+             refresh: bool = True):
+        """It changes a product and moves it to another row.
+
+        The products between both rows are shifted by one with a single
+        slice assignment, a product that keeps its row is overwritten
+        in place. Rows of H from the lower of both rows up are
+        recomputed by refresh.
+
+        Parameters
+        ----------
+            old: int
+                Current row of the product.
+            new: int
+                Row of the product once changed, it must keep the
+                products sorted by the Lemma 1 key.
+            revenue: float
+                New revenue of the product.
+            probability: float
+                New probability of the product.
+            refresh: bool, default True
+                Should the affected rows be recomputed?
+        """
+
+        active = self.active[old]
+        for values in (self.revenue, self.probability, self.active):
+            if new < old:
+                values[new + 1:old + 1] = values[new:old]
+            elif new > old:
+                values[old:new] = values[old + 1:new + 1]
+        self.revenue[new] = revenue
+        self.probability[new] = probability
+        self.active[new] = active
+        if refresh:
+            self.refresh(max(old, new), unchanged_below=min(old, new))
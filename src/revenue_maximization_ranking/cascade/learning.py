@@ -0,0 +1,292 @@
+"""Estimation of purchase probabilities from click logs.
+
+Every logged session records the products shown in ranking order, the
+attention depth reached by the customer (how many positions they
+looked at) and the position of the purchase, 0 if nothing was bought.
+Under the cascade model a customer sees the products one at a time and
+stops at the first one they purchase, so the product at position t was
+seen if t <= depth and t <= purchase position (when there is one), and
+the products after a purchase were never evaluated. Counting them as
+seen would bias the probabilities towards zero.
+
+The probability of a product is estimated by purchased / seen, its
+maximum likelihood estimator under the cascade model. Logs are counted
+a chunk of sessions at a time with numpy and the counts of different
+chunks or logs are merged, so a day of logs can be folded into the
+counts of the previous days without reading them again.
+
+Classes
+-------
+    ClickCounts:
+        Seen and purchased counts of every product.
+
+Functions
+---------
+    count_sessions:
+        It counts a log of sessions a chunk at a time.
+    aggregate_logs:
+        It counts and merges many logs.
+"""
+
+import numpy as np
+from typing import Iterable, Tuple
+
+__all__ = ["ClickCounts", "count_sessions", "aggregate_logs"]
+
+
+class ClickCounts:
+    """Seen and purchased counts of every product.
+
+    Parameters
+    ----------
+        ids: optional, array-like
+            Ids of the products, sorted and unique.
+        seen: optional, array-like
+            Number of sessions in which each product was seen.
+        purchased: optional, array-like
+            Number of sessions in which each product was purchased.
+
+    Attributes
+    ----------
+        ids: numpy.ndarray
+            Sorted ids of the products.
+        seen: numpy.ndarray
+            Integer array with the number of times each product was
+            seen.
+        purchased: numpy.ndarray
+            Integer array with the number of times each product was
+            purchased.
+    """
+
+    __slots__ = ("ids", "seen", "purchased")
+
+    def __init__(self, ids=None, seen=None, purchased=None):
+        self.ids = np.asarray([] if ids is None else ids)
+        self.seen = np.asarray([] if seen is None else seen, dtype=np.int64)
+        self.purchased = np.asarray([] if purchased is None else purchased,
+                                    dtype=np.int64)
+        if not (self.ids.shape == self.seen.shape
+                == self.purchased.shape) or self.ids.ndim != 1:
+            raise ValueError("ids, seen and purchased must be one "
+                             "dimensional and of the same length.")
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    def merge(self, other: "ClickCounts") -> "ClickCounts":
+        """The counts of both logs together.
+
+        Parameters
+        ----------
+            other: ClickCounts
+                Counts of another log.
+
+        Returns
+        -------
+            counts: ClickCounts
+                New counts with the sum for every product.
+        """
+
+        if len(other) == 0:
+            return self
+        if len(self) == 0:
+            return other
+
+        ids, inverse = np.unique(np.concatenate((self.ids, other.ids)),
+                                 return_inverse=True)
+        seen = np.zeros(ids.shape[0], dtype=np.int64)
+        np.add.at(seen, inverse, np.concatenate((self.seen, other.seen)))
+        purchased = np.zeros(ids.shape[0], dtype=np.int64)
+        np.add.at(purchased, inverse, np.concatenate((self.purchased,
+                                                      other.purchased)))
+        return ClickCounts(ids, seen, purchased)
+
+    def probability(self, prior_alpha: float = 0.0,
+                    prior_beta: float = 0.0) -> np.ndarray:
+        """Estimated purchase probability of every product.
+
+        Parameters
+        ----------
+            prior_alpha: float, default 0.0
+                Pseudo purchases added to every product.
+            prior_beta: float, default 0.0
+                Pseudo sessions without purchase added to every
+                product.
+
+        Returns
+        -------
+            probability: numpy.ndarray
+                (purchased + prior_alpha) / (seen + prior_alpha +
+                prior_beta), NaN for products never seen without a
+                prior.
+        """
+
+        total = self.seen + prior_alpha + prior_beta
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0,
+                            (self.purchased + prior_alpha) / total, np.nan)
+
+    def posterior(self, prior_alpha: float = 1.0,
+                  prior_beta: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Parameters of the Beta posterior of every probability.
+
+        They can be used to sample scenarios of the probabilities, see
+        robust.sample_probabilities.
+
+        Parameters
+        ----------
+            prior_alpha, prior_beta: float, default 1.0
+                Parameters of the Beta prior, uniform by default.
+
+        Returns
+        -------
+            alpha, beta: tuple[numpy.ndarray, numpy.ndarray]
+                purchased + prior_alpha and seen - purchased +
+                prior_beta.
+        """
+
+        return (self.purchased + prior_alpha,
+                self.seen - self.purchased + prior_beta)
+
+    def to_dataframe(self, probability_col: str = "probability",
+                     prior_alpha: float = 0.0, prior_beta: float = 0.0):
+        """The counts as a dataframe indexed by product id.
+
+        The dataframe has the columns seen, purchased and the estimated
+        probability, it can be joined with the revenues of the products
+        and passed to full_best_x. It requires pandas.
+
+        Parameters
+        ----------
+            probability_col: str, default "probability"
+                Name of the column with the estimated probabilities.
+            prior_alpha, prior_beta: float, default 0.0
+                See probability.
+
+        Returns
+        -------
+            df: pandas.DataFrame
+                Counts and estimates of every product.
+        """
+
+        import pandas as pd
+
+        return pd.DataFrame({"seen": self.seen,
+                             "purchased": self.purchased,
+                             probability_col: self.probability(prior_alpha,
+                                                               prior_beta)},
+                            index=pd.Index(self.ids, name="product_id"))
+
+    def save(self, path: str):
+        """It writes the counts to a .npz file."""
+        np.savez(path, ids=self.ids, seen=self.seen,
+                 purchased=self.purchased)
+
+    @classmethod
+    def load(cls, path: str) -> "ClickCounts":
+        """It reads counts written by save."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"], data["seen"], data["purchased"])
+
+
+def _count_chunk(shown: np.ndarray, depth: np.ndarray, purchase: np.ndarray,
+                 pad) -> ClickCounts:
+    """The counts of a chunk of sessions held in memory."""
+
+    if np.any(purchase > depth) or np.any(purchase < 0):
+        raise ValueError("Purchase positions must be between 0 and the "
+                         "depth of their session.")
+
+    positions = np.arange(1, shown.shape[1] + 1)
+    stop = np.where(purchase > 0, np.minimum(depth, purchase), depth)
+    seen = positions <= stop[:, None]
+    bought = positions == purchase[:, None]
+    if pad is not None:
+        valid = shown != pad
+        seen &= valid
+        bought &= valid
+
+    ids, inverse = np.unique(shown[seen], return_inverse=True)
+    seen_counts = np.bincount(inverse, minlength=ids.shape[0])
+    # Purchased products are seen, so their ids are among the seen ones.
+    purchased_counts = np.bincount(np.searchsorted(ids, shown[bought]),
+                                   minlength=ids.shape[0])
+    return ClickCounts(ids, seen_counts, purchased_counts)
+
+
+def count_sessions(shown: np.ndarray, depth: np.ndarray,
+                   purchase: np.ndarray, pad=None,
+                   chunk_size: int = 2**20) -> ClickCounts:
+    """It counts a log of sessions a chunk at a time.
+
+    The arrays are read a chunk of sessions at a time, so they can be
+    memory mapped (e.g. numpy.load(path, mmap_mode="r")) and larger
+    than memory.
+
+    Parameters
+    ----------
+        shown: numpy.ndarray
+            Array of shape (n_sessions, length) with the ids of the
+            products shown in each session, in ranking order. Shorter
+            rankings are padded with pad at the end.
+        depth: numpy.ndarray
+            Number of positions looked at in each session.
+        purchase: numpy.ndarray
+            Position (starting at 1) of the product purchased in each
+            session, 0 if nothing was purchased.
+        pad: optional
+            Id used to pad shorter rankings, those entries are ignored.
+        chunk_size: int, default 2**20
+            Number of sessions counted at a time.
+
+    Returns
+    -------
+        counts: ClickCounts
+            Seen and purchased counts of every product seen at least
+            once.
+    """
+
+    n_sessions = shown.shape[0]
+    if not depth.shape[0] == purchase.shape[0] == n_sessions:
+        raise ValueError("shown, depth and purchase must have a row per "
+                         "session.")
+
+    counts = ClickCounts()
+    for start in range(0, n_sessions, chunk_size):
+        stop = min(start + chunk_size, n_sessions)
+        counts = counts.merge(_count_chunk(
+            np.asarray(shown[start:stop]),
+            np.asarray(depth[start:stop], dtype=np.int64),
+            np.asarray(purchase[start:stop], dtype=np.int64), pad))
+
+    return counts
+
+
+def aggregate_logs(logs: Iterable[Tuple], counts: ClickCounts = None,
+                   pad=None, chunk_size: int = 2**20) -> ClickCounts:
+    """It counts and merges many logs.
+
+    Parameters
+    ----------
+        logs: Iterable
+            Tuples (shown, depth, purchase) of arrays, as taken by
+            count_sessions, for instance the logs of every day.
+        counts: optional, ClickCounts
+            Counts of previous logs to be updated.
+        pad: optional
+            Id used to pad shorter rankings.
+        chunk_size: int, default 2**20
+            Number of sessions counted at a time.
+
+    Returns
+    -------
+        counts: ClickCounts
+            Counts of all the logs (and of counts, if given).
+    """
+
+    counts = ClickCounts() if counts is None else counts
+    for shown, depth, purchase in logs:
+        counts = counts.merge(count_sessions(shown, depth, purchase, pad=pad,
+                                             chunk_size=chunk_size))
+
+    return counts
@@ -0,0 +1,376 @@
+"""Local search over rankings.
+
+The best-x strategy is a heuristic when attention spans are random, so
+its ranking can often be improved. This module starts from a ranking
+and applies improving moves until none is left or a budget runs out:
+
+    swap: two ranked products exchange their positions.
+    insert: a ranked product is moved to another position, shifting
+        the products in between.
+    replace: a ranked product is replaced by a product left out.
+
+Let A_i be the probability of reaching position i, the product of
+(1 - p_j) over the previous positions, w_i = p_i * r_i * G(i) and T_i
+the expected revenue from position i onward for a customer reaching
+it, T_i = w_i + (1 - p_i) * T_{i+1}. A move whose first changed
+position is a changes the revenue by A_a times the change of T_a, and
+the new T_a only needs running products of (1 - p) from a. So all the
+moves starting at a are scored at once with a few vectorized passes,
+in constant amortized time per move, using G cached by
+attention.survival.
+
+Products left out only matter for replace moves through (p, p * r):
+the new T_a is G(a) * p * r - T_{a+1} * p + T_{a+1}, so only products
+without another one of lower p and higher p * r are scored.
+
+Functions
+---------
+    improve_ranking:
+        It improves a ranking with local search.
+    best_x_local_search:
+        best_x_full_capacity followed by local search.
+"""
+
+import time
+import numpy as np
+from collections import namedtuple
+from typing import Dict, Iterable, Tuple, Union
+from revenue_maximization_ranking.cascade.attention import survival
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["improve_ranking", "best_x_local_search", "LocalSearchResult"]
+
+MOVES = ("swap", "insert", "replace")
+
+LocalSearchResult = namedtuple("LocalSearchResult", [
+    "ranking", "revenue", "initial_revenue", "improvement", "iterations"])
+
+
+def tails(revenue: np.ndarray, probability: np.ndarray,
+          attention: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Reach of every position and expected revenue from it onward.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the ranked products.
+        probability: numpy.ndarray
+            Probabilities of the ranked products.
+        attention: numpy.ndarray
+            G(i) for every position i, at least as long as the ranking.
+
+    Returns
+    -------
+        reach, tail: tuple[numpy.ndarray, numpy.ndarray]
+            A_i for every position and T_i for every position plus a
+            final 0.
+    """
+
+    length = revenue.shape[0]
+    reach = np.ones(length)
+    np.cumprod(1.0 - probability[:-1], out=reach[1:])
+    weights = (probability * revenue * attention[:length]).tolist()
+    complements = (1.0 - probability).tolist()
+    tail = [0.0] * (length + 1)
+    for i in range(length - 1, -1, -1):
+        tail[i] = weights[i] + complements[i] * tail[i + 1]
+
+    return reach, np.array(tail)
+
+
+def frontier(revenue: np.ndarray, probability: np.ndarray) -> np.ndarray:
+    """Products worth scoring in replace moves.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products left out.
+        probability: numpy.ndarray
+            Their probabilities.
+
+    Returns
+    -------
+        positions: numpy.ndarray
+            Positions of the products with a larger p * r than every
+            product with a lower (or equal, listed first) p.
+    """
+
+    value = probability * revenue
+    order = np.lexsort((-value, probability))
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf],
+                                                        value[order])))
+    return order[value[order] > best_before[:-1]]
+
+
+def best_move(anchor: int, revenue: np.ndarray, probability: np.ndarray,
+              attention: np.ndarray, tail: np.ndarray,
+              outside: Tuple[np.ndarray, np.ndarray],
+              moves: Iterable[str]) -> Tuple[float, Tuple]:
+    """The best move whose first changed position is anchor.
+
+    Parameters
+    ----------
+        anchor: int
+            First position changed by the moves.
+        revenue, probability: numpy.ndarray
+            Revenues and probabilities of the ranked products.
+        attention: numpy.ndarray
+            G(i) for every position, one longer than the ranking.
+        tail: numpy.ndarray
+            T_i as returned by tails.
+        outside: tuple[numpy.ndarray, numpy.ndarray]
+            Revenues and probabilities of the products that can be
+            used by replace moves.
+        moves: Iterable
+            Names of the moves considered.
+
+    Returns
+    -------
+        change, move: tuple[float, tuple]
+            Change of T_anchor and the move, (name, position), or
+            (0.0, None) if no move improves it. Inserts moving the
+            product at position to anchor are named "pull".
+    """
+
+    a = anchor
+    length = revenue.shape[0]
+    weight_a = probability[a] * revenue[a]
+    best, move = 0.0, None
+    if a + 1 < length and ("swap" in moves or "insert" in moves):
+        # Positions j = a + 1, ..., length - 1 and their running product
+        # of (1 - p) over the positions strictly between a and j.
+        j = np.arange(a + 1, length)
+        p, r = probability[a + 1:], revenue[a + 1:]
+        between = np.ones(j.shape[0])
+        np.cumprod(1.0 - p[:-1], out=between[1:])
+
+        if "swap" in moves:
+            middle = np.cumsum(between * p * r * attention[j]) \
+                - between * p * r * attention[j]
+            values = (p * r * attention[a] + (1.0 - p)
+                      * (middle + between * (weight_a * attention[j]
+                                             + (1.0 - probability[a])
+                                             * tail[j + 1])))
+            k = int(np.argmax(values))
+            if values[k] - tail[a] > best:
+                best, move = values[k] - tail[a], ("swap", a + 1 + k)
+
+        if "insert" in moves:
+            # Product at a moved to j, products in between move up.
+            shifted = np.cumsum(between * p * r * attention[j - 1])
+            values = shifted + between * (1.0 - p) * (
+                weight_a * attention[j] + (1.0 - probability[a])
+                * tail[j + 1])
+            k = int(np.argmax(values))
+            if values[k] - tail[a] > best:
+                best, move = values[k] - tail[a], ("insert", a + 1 + k)
+
+            # Product at j moved to a, products in between move down.
+            since = np.ones(j.shape[0])
+            np.cumprod(1.0 - probability[a:-1], out=since)
+            before = np.concatenate(([1.0], since[:-1]))
+            pushed = np.cumsum(before * probability[a:-1] * revenue[a:-1]
+                               * attention[a + 1:length])
+            values = p * r * attention[a] + (1.0 - p) * (
+                pushed + since * tail[j + 1])
+            k = int(np.argmax(values))
+            if values[k] - tail[a] > best:
+                best, move = values[k] - tail[a], ("pull", a + 1 + k)
+
+    if "replace" in moves and outside[0].shape[0]:
+        values = (outside[1] * (outside[0] * attention[a] - tail[a + 1])
+                  + tail[a + 1])
+        k = int(np.argmax(values))
+        if values[k] - tail[a] > best:
+            best, move = values[k] - tail[a], ("replace", k)
+
+    return best, move
+
+
+def _apply(move: Tuple, anchor: int, arrays: Dict, candidates: np.ndarray):
+    """It applies a move to the ranking (and the products left out)."""
+
+    name, target = move
+    order = np.arange(arrays["ranked"].shape[0])
+    if name == "swap":
+        order[[anchor, target]] = order[[target, anchor]]
+    elif name == "insert":
+        order[anchor:target] = order[anchor + 1:target + 1]
+        order[target] = anchor
+    elif name == "pull":
+        order[anchor + 1:target + 1] = order[anchor:target]
+        order[anchor] = target
+    else:
+        k = candidates[target]
+        ranked, left_out = arrays["ranked"], arrays["left_out"]
+        ranked[anchor], left_out[k] = left_out[k], ranked[anchor]
+        return
+
+    arrays["ranked"] = arrays["ranked"][order]
+
+
+def improve_ranking(ranking: Union[Iterable, Products], g: DistributionLike,
+                    products: Union[Dict, Products] = None,
+                    max_iterations: int = 1000, time_limit: float = None,
+                    moves: Iterable[str] = MOVES) -> LocalSearchResult:
+    """It improves a ranking with local search.
+
+    Every anchor position is visited in order and its best move is
+    applied if it increases the expected revenue. The search stops at
+    a local optimum (a whole pass without improvements) or when a
+    budget runs out. The length of the ranking does not change.
+
+    Parameters
+    ----------
+        ranking: Iterable or Products
+            The starting ranking, an iterable object of (id, dict)
+            tuples or ranked Products.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        products: optional, dict or Products
+            Set of products the ranking comes from, those left out are
+            used by replace moves. Without it there are no replace
+            moves.
+        max_iterations: int, default 1000
+            Maximum number of moves applied.
+        time_limit: optional, float
+            Maximum number of seconds, checked between anchors.
+        moves: Iterable, default ("swap", "insert", "replace")
+            Names of the moves to be used.
+
+    Returns
+    -------
+        result: LocalSearchResult
+            The improved ranking (Products if the ranking is Products,
+            otherwise a list of (id, dict) tuples), its expected
+            revenue, the revenue of the starting ranking, the
+            improvement and the number of moves applied.
+    """
+
+    start = time.perf_counter()
+    moves = tuple(moves)
+    unknown = set(moves) - set(MOVES)
+    if unknown:
+        raise ValueError(f"Unknown moves: {sorted(unknown)}.")
+
+    if isinstance(ranking, Products):
+        ranked = ranking
+    else:
+        ranking = list(ranking)
+        ranked = Products.from_dict(dict(ranking))
+    pool = ranked
+    if products is not None:
+        pool = as_products(products)
+        in_ranking = set(ranked.ids.tolist())
+        left_out = np.array([name not in in_ranking
+                             for name in pool.ids.tolist()], dtype=bool)
+        pool = Products(np.concatenate((ranked.ids, pool.ids[left_out])),
+                        np.concatenate((ranked.revenue,
+                                        pool.revenue[left_out])),
+                        np.concatenate((ranked.probability,
+                                        pool.probability[left_out])))
+
+    length = len(ranked)
+    arrays = {"ranked": np.arange(length),
+              "left_out": np.arange(length, len(pool))}
+    attention = survival(g, length + 1)
+
+    def state():
+        revenue = pool.revenue[arrays["ranked"]]
+        probability = pool.probability[arrays["ranked"]]
+        candidates = np.zeros(0, dtype=np.intp)
+        if "replace" in moves:
+            candidates = frontier(pool.revenue[arrays["left_out"]],
+                                  pool.probability[arrays["left_out"]])
+        outside = (pool.revenue[arrays["left_out"][candidates]],
+                   pool.probability[arrays["left_out"][candidates]])
+        return (revenue, probability, *tails(revenue, probability,
+                                             attention),
+                outside, candidates)
+
+    revenue, probability, reach, tail, outside, candidates = state()
+    initial_revenue = float(tail[0]) if length else 0.0
+    tolerance = 1e-12 * max(1.0, abs(initial_revenue))
+    iterations = 0
+    improved = True
+    out_of_time = False
+    while improved and iterations < max_iterations and not out_of_time:
+        improved = False
+        for anchor in range(length):
+            if time_limit is not None \
+                    and time.perf_counter() - start > time_limit:
+                out_of_time = True
+                break
+            if reach[anchor] == 0.0:
+                break
+            change, move = best_move(anchor, revenue, probability,
+                                     attention, tail, outside, moves)
+            if move is None or reach[anchor] * change <= tolerance:
+                continue
+
+            _apply(move, anchor, arrays, candidates)
+            revenue, probability, reach, tail, outside, candidates = state()
+            iterations += 1
+            improved = True
+            if iterations >= max_iterations:
+                break
+
+    final = pool.take(arrays["ranked"])
+    final_revenue = float(tail[0]) if length else 0.0
+    if isinstance(ranking, Products):
+        improved_ranking = final
+    else:
+        lookup = dict(ranking)
+        if isinstance(products, dict):
+            lookup.update(products)
+        # Products brought in from a Products pool are built from it.
+        names = final.ids.tolist()
+        missing = [row for row, name in enumerate(names)
+                   if name not in lookup]
+        lookup.update(final.take(np.array(missing, dtype=np.intp)))
+        improved_ranking = [(name, lookup[name]) for name in names]
+
+    return LocalSearchResult(improved_ranking, final_revenue,
+                             initial_revenue,
+                             final_revenue - initial_revenue, iterations)
+
+
+def best_x_local_search(products: Union[Dict, Products],
+                        g: DistributionLike, capacity: int,
+                        max_iterations: int = 1000, time_limit: float = None,
+                        moves: Iterable[str] = MOVES) -> LocalSearchResult:
+    """best_x_full_capacity followed by local search.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products, keys must be the product ids and values
+            must be dictionaries with the revenue and probability of
+            each product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        max_iterations, time_limit, moves: optional
+            Budgets and moves of the local search, see
+            improve_ranking.
+
+    Returns
+    -------
+        result: LocalSearchResult
+            As returned by improve_ranking, the improvement is over
+            the best-x ranking.
+    """
+
+    prods = as_products(products)
+    ranking = best_x_full_capacity(prods, g, capacity, show_xs=False)
+    result = improve_ranking(ranking, g, prods,
+                             max_iterations=max_iterations,
+                             time_limit=time_limit, moves=moves)
+    return result._replace(ranking=match_format(result.ranking, products))
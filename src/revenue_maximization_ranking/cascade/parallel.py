@@ -0,0 +1,135 @@
+"""Parallel ranking of many product sets.
+
+Ranking a product set is CPU bound and independent from other product
+sets, so a batch of them (for instance one per search) can be spread
+over a pool of processes.
+
+Only compact numpy arrays are sent to the workers: the revenues and
+probabilities of each product set go in, the positions of the ranked
+products and the chosen xs come back. Results are returned in the same
+order as the product sets.
+
+The distribution of attention spans g is shared with the workers
+through the pool initializer, so it is pickled once per worker process
+instead of once per product set. Frozen scipy.stats distributions and
+arrays of attention probabilities can be pickled. Every worker keeps
+its own cache of survival values (see attention.survival), which is
+filled the first time the worker uses g.
+
+Functions
+---------
+    rank_many:
+        It applies the best-x strategy up to full capacity to many
+        product sets.
+    rank_arrays:
+        best_x_full_capacity on unsorted arrays of products.
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+from revenue_maximization_ranking.cascade\
+                                 .best_x import full_capacity_positions
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["rank_many"]
+
+# Distribution of attention spans of the current worker process.
+_worker_g = None
+
+
+def _init_worker(g: DistributionLike):
+    """It stores the distribution of attention spans in the worker."""
+    global _worker_g
+    _worker_g = g
+
+
+def rank_arrays(revenue: np.ndarray, probability: np.ndarray,
+                g: DistributionLike, capacity: int,
+                incremental: bool = False) -> Tuple[np.ndarray, List]:
+    """best_x_full_capacity on unsorted arrays of products.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products.
+        probability: numpy.ndarray
+            Probabilities of the products in the same order.
+        g: DistributionLike
+            Distribution of attention spans.
+        capacity: int
+            Maximum number of items that the retailer can display.
+        incremental: bool, optional, default: False
+            See best_x.best_x_full_capacity.
+
+    Returns
+    -------
+        positions, best_xs: tuple[numpy.ndarray, list]
+            Positions in the input arrays of the ranked products, in
+            ranking order, and the list of xs' values chosen.
+    """
+
+    order = np.lexsort((-probability, -revenue))
+    positions, best_xs = full_capacity_positions(revenue[order],
+                                                 probability[order], g,
+                                                 capacity,
+                                                 incremental=incremental)
+    return order[positions], best_xs
+
+
+def _rank_task(task: Tuple) -> Tuple[np.ndarray, List]:
+    """It ranks a product set inside a worker process."""
+    revenue, probability, capacity, incremental = task
+    return rank_arrays(revenue, probability, _worker_g, capacity,
+                       incremental=incremental)
+
+
+def rank_many(product_sets: Iterable[Tuple[np.ndarray, np.ndarray]],
+              g: DistributionLike, capacity: int = 0, workers: int = None,
+              incremental: bool = False,
+              chunksize: int = 1) -> List[Tuple[np.ndarray, List]]:
+    """It applies the best-x strategy up to full capacity to many
+    product sets.
+
+    Parameters
+    ----------
+        product_sets: Iterable
+            Pairs of arrays with the revenues and the probabilities of
+            the products in each set.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int, default 0
+            Maximum number of products that the retailer can display
+            for each set, if lower than 1 the size of the set is used.
+        workers: optional, int
+            Number of worker processes, by default the number of
+            processors. With 1 everything runs in the current process.
+        incremental: bool, optional, default: False
+            See best_x.best_x_full_capacity.
+        chunksize: int, default 1
+            Number of product sets sent to a worker at a time.
+
+    Returns
+    -------
+        results: list
+            For each product set, in the same order, a tuple with the
+            positions of the ranked products (in ranking order) and
+            the list of xs' values chosen.
+    """
+
+    tasks = []
+    for revenue, probability in product_sets:
+        revenue = np.ascontiguousarray(revenue, dtype=np.float64)
+        probability = np.ascontiguousarray(probability, dtype=np.float64)
+        set_capacity = capacity if capacity >= 1 else revenue.shape[0]
+        tasks.append((revenue, probability, set_capacity, incremental))
+
+    if workers == 1 or len(tasks) < 2:
+        return [rank_arrays(revenue, probability, g, set_capacity,
+                            incremental=incremental)
+                for revenue, probability, set_capacity, _ in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(g,)) as executor:
+        return list(executor.map(_rank_task, tasks, chunksize=chunksize))
@@ -0,0 +1,193 @@
+"""Array-native products.
+
+Everywhere in this module a set of products can be given as a
+dictionary, keys are the products ids and values are dictionaries with
+the revenue and probability of each product. Looking those values up
+product by product is slow for large sets, so the Products class keeps
+them in contiguous float64 arrays instead.
+
+The dictionary format remains supported: functions accepting products
+convert dictionaries to Products and give back their results in the
+same format they received.
+
+Classes
+-------
+    Products:
+        A set of products stored as arrays.
+
+Functions
+---------
+    as_products:
+        It converts a set of products to Products.
+    match_format:
+        It gives a ranking back in the format of the original products.
+"""
+
+import numpy as np
+from typing import Dict, Iterator, List, Tuple, Union
+
+__all__ = ["Products", "as_products", "match_format"]
+
+
+class Products:
+    """A set of products stored as arrays.
+
+    Parameters
+    ----------
+        ids: array-like
+            Ids of the products.
+        revenue: array-like
+            Revenue of each product if purchased.
+        probability: array-like
+            Probability of purchasing each product once it is seen.
+
+    Attributes
+    ----------
+        ids: numpy.ndarray
+            Ids of the products.
+        revenue: numpy.ndarray
+            Float64 array with the revenue of each product.
+        probability: numpy.ndarray
+            Float64 array with the probability of each product.
+    """
+
+    __slots__ = ("ids", "revenue", "probability")
+
+    def __init__(self, ids, revenue, probability):
+        self.ids = np.asarray(ids)
+        self.revenue = np.asarray(revenue, dtype=np.float64)
+        self.probability = np.asarray(probability, dtype=np.float64)
+        if not (self.ids.shape == self.revenue.shape
+                == self.probability.shape) or self.ids.ndim != 1:
+            raise ValueError("ids, revenue and probability must be "
+                             "one dimensional and of the same length.")
+
+    @classmethod
+    def from_dict(cls, products: Dict) -> "Products":
+        """It builds Products from the dictionary format.
+
+        Parameters
+        ----------
+            products: dict
+                Keys must be the products ids and values must be
+                dictionaries with the revenue and probability of each
+                product.
+
+        Returns
+        -------
+            products: Products
+                The same products stored as arrays.
+        """
+
+        ids = np.empty(len(products), dtype=object)
+        for i, name in enumerate(products):
+            ids[i] = name
+
+        revenue = [product["revenue"] for product in products.values()]
+        probability = [product["probability"]
+                       for product in products.values()]
+        return cls(ids, revenue, probability)
+
+    @classmethod
+    def from_dataframe(cls, df, revenue_col: str,
+                       probability_col: str) -> "Products":
+        """It builds Products from the columns of a dataframe.
+
+        Float64 columns are not copied.
+
+        Parameters
+        ----------
+            df: pandas.DataFrame
+                The dataframe with the products' data, its index holds
+                the products ids.
+            revenue_col: str
+                Name of the column with the revenue for each product.
+            probability_col: str
+                Name of the column with the conditional probabilities
+                of purchasing the product once it is seen by the user.
+
+        Returns
+        -------
+            products: Products
+                The products of the dataframe.
+        """
+
+        return cls(df.index.to_numpy(),
+                   df[revenue_col].to_numpy(dtype=np.float64, copy=False),
+                   df[probability_col].to_numpy(dtype=np.float64,
+                                                copy=False))
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    def __iter__(self) -> Iterator[Tuple]:
+        """It yields the products as (id, dict) tuples."""
+        for name, revenue, probability in zip(self.ids, self.revenue,
+                                              self.probability):
+            yield name, {"revenue": float(revenue),
+                         "probability": float(probability)}
+
+    def __repr__(self) -> str:
+        return f"Products(n={len(self)})"
+
+    def take(self, positions: np.ndarray) -> "Products":
+        """The products at the given positions, in that order."""
+        return Products(self.ids[positions], self.revenue[positions],
+                        self.probability[positions])
+
+    def key_order(self) -> np.ndarray:
+        """Positions of the products sorted by the Lemma 1 key.
+
+        The order is decreasing and stable, like sorting the products
+        with fixed_attention.key and reverse=True.
+        """
+
+        return np.lexsort((-self.probability, -self.revenue))
+
+    def to_dict(self) -> Dict:
+        """The products in the dictionary format."""
+        return dict(iter(self))
+
+
+def as_products(products: Union[Dict, Products]) -> Products:
+    """It converts a set of products to Products.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products.
+
+    Returns
+    -------
+        products: Products
+            The same products, not copied if already Products.
+    """
+
+    if isinstance(products, Products):
+        return products
+
+    return Products.from_dict(products)
+
+
+def match_format(ranking: Products,
+                 products: Union[Dict, Products]) -> Union[List, Products]:
+    """It gives a ranking back in the format of the original products.
+
+    Parameters
+    ----------
+        ranking: Products
+            Ranked products.
+        products: dict or Products
+            The products from which the ranking was built.
+
+    Returns
+    -------
+        ranking: list or Products
+            The ranking itself if products are Products, otherwise a
+            list of (id, dict) tuples taken from products.
+    """
+
+    if isinstance(products, Products):
+        return ranking
+
+    return [(name, products[name]) for name in ranking.ids]
@@ -0,0 +1,167 @@
+"""Opt-in instrumentation of the cascade solvers.
+
+Inside a profile block the solvers record how long each stage takes
+and how much work they do:
+
+    with profile() as stats:
+        full_best_x(df, "revenue", "probability", g)
+    stats.as_dict()
+
+Stages (wall time in seconds):
+    load: reading the products from a dataframe.
+    prune: dominance filter.
+    dp: filling the dynamic programming table.
+    choose_x: evaluating the lower bounds of every x.
+    backtrack: rebuilding rankings from the table.
+    output: building the rank column.
+
+Counters:
+    dp_cells: cells of the dynamic programming table evaluated.
+    best_x_rounds: rounds of best_x_full_capacity.
+    survival_lookups: attention survival values requested.
+    sf_calls, pmf_calls: calls to g.sf and g.pmf (cache misses).
+    pruned: products discarded by the dominance filter.
+    groups: product sets ranked by grouped functions.
+
+Products available at every best-x round are kept in round_sizes.
+
+Outside a profile block recording is a context variable lookup, so the
+overhead of the instrumentation is close to zero. Profiles are local to
+the thread or asyncio task that opens them.
+
+Classes
+-------
+    ProfileStats:
+        Statistics recorded within a profile block.
+
+Functions
+---------
+    profile:
+        It records statistics of the solvers within a block.
+"""
+
+from time import perf_counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, Optional
+
+__all__ = ["ProfileStats", "profile"]
+
+_current = ContextVar("revenue_maximization_ranking_profile", default=None)
+_disabled = nullcontext()
+
+
+class ProfileStats:
+    """Statistics recorded within a profile block.
+
+    Attributes
+    ----------
+        wall_time: float
+            Seconds spent within the block.
+        stages: dict
+            Seconds spent in each stage.
+        counters: dict
+            Counters of the work done.
+        round_sizes: list
+            Number of products available at each best-x round.
+    """
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.round_sizes = []
+
+    def __repr__(self) -> str:
+        return (f"ProfileStats(wall_time={self.wall_time:.6f}, "
+                f"stages={dict(self.stages)}, "
+                f"counters={dict(self.counters)})")
+
+    def as_dict(self) -> Dict:
+        """Flat dictionary of the statistics, ready to be exported.
+
+        Stages are prefixed by "time_" and counters by "count_".
+        """
+
+        stats = {"wall_time": self.wall_time,
+                 "round_sizes": list(self.round_sizes)}
+        stats.update({f"time_{name}": value
+                      for name, value in self.stages.items()})
+        stats.update({f"count_{name}": value
+                      for name, value in self.counters.items()})
+        return stats
+
+
+class _Stage:
+    """Context manager timing a stage."""
+
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats: ProfileStats, name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.stats.stages[self.name] += perf_counter() - self.start
+
+
+def current() -> Optional[ProfileStats]:
+    """The statistics being recorded, None outside a profile block."""
+    return _current.get()
+
+
+def stage(name: str):
+    """Context manager timing a stage, it does nothing when disabled."""
+    stats = _current.get()
+    if stats is None:
+        return _disabled
+
+    return _Stage(stats, name)
+
+
+def count(name: str, value: int = 1):
+    """It adds value to a counter, it does nothing when disabled."""
+    stats = _current.get()
+    if stats is not None:
+        stats.counters[name] += value
+
+
+def best_x_round(n_products: int):
+    """It records a best-x round, it does nothing when disabled."""
+    stats = _current.get()
+    if stats is not None:
+        stats.counters["best_x_rounds"] += 1
+        stats.round_sizes.append(n_products)
+
+
+@contextmanager
+def profile(callback: Callable[[ProfileStats], None] = None
+            ) -> Iterator[ProfileStats]:
+    """It records statistics of the solvers within a block.
+
+    Parameters
+    ----------
+        callback: optional, Callable
+            Called with the statistics when the block ends, for
+            instance to export them to a metrics pipeline.
+
+    Yields
+    ------
+        stats: ProfileStats
+            Statistics, complete once the block ends.
+    """
+
+    stats = ProfileStats()
+    token = _current.set(stats)
+    start = perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall_time = perf_counter() - start
+        _current.reset(token)
+        if callback is not None:
+            callback(stats)
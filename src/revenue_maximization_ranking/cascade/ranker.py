@@ -0,0 +1,209 @@
+"""Stateful ranking of a changing set of products.
+
+Prices and purchase probabilities change for a handful of products at
+a time. Instead of solving the whole fixed attention problem again
+after every change, a Ranker keeps the dynamic programming table of
+fixed_attention and updates only the rows affected by the change: the
+rows of H for the products that come before the changed one in the
+Lemma 1 order (rows after it describe sets of products that did not
+change). The best-x ranking is then refreshed from the updated table.
+
+Changes to products with high revenue are cheap, since few products
+come before them, while changes at the bottom of the order cost about
+as much as a full solve.
+
+Classes
+-------
+    Ranker:
+        Best-x ranking of a set of products that can be updated.
+"""
+
+import numpy as np
+from typing import Dict, Hashable, List, Tuple, Union
+from revenue_maximization_ranking.cascade.best_x import table_rounds
+from revenue_maximization_ranking.cascade\
+                                 .fixed_attention import FixedAttentionTable
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["Ranker"]
+
+
+class Ranker:
+    """Best-x ranking of a set of products that can be updated.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products, keys must be the product ids and values
+            must be dictionaries with the revenue and probability of
+            each product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+
+    Attributes
+    ----------
+        table: FixedAttentionTable
+            Table of the products sorted by the Lemma 1 key.
+        ids: list
+            Ids of the products in the same order as the table.
+    """
+
+    def __init__(self, products: Union[Dict, Products], g: DistributionLike,
+                 capacity: int):
+        prods = as_products(products)
+        order = prods.key_order()
+        self.g = g
+        self.capacity = capacity
+        self.ids = prods.ids[order].tolist()
+        self._rows = {product_id: row
+                      for row, product_id in enumerate(self.ids)}
+        self.table = FixedAttentionTable(prods.revenue[order],
+                                         prods.probability[order], capacity)
+        self._ranking = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, product_id: Hashable) -> bool:
+        return product_id in self._rows
+
+    def _row(self, product_id: Hashable) -> int:
+        """Row of a ranked product in the table."""
+        try:
+            return self._rows[product_id]
+        except KeyError:
+            raise KeyError(f"Product {product_id!r} is not ranked.") \
+                from None
+
+    def _reindex(self, start: int, stop: int):
+        """It updates the rows of the ids from start to stop."""
+        for row in range(start, stop):
+            self._rows[self.ids[row]] = row
+
+    @property
+    def products(self) -> Products:
+        """The current products, sorted by the Lemma 1 key."""
+        ids = np.empty(len(self.ids), dtype=object)
+        ids[:] = self.ids
+        return Products(ids, self.table.revenue, self.table.probability)
+
+    def _position(self, revenue: float, probability: float,
+                  exclude: int = None) -> int:
+        """Row for a new product, after the products with equal key.
+
+        The row in exclude, if any, is not counted, as if the product
+        there was deleted first.
+        """
+
+        revenues, probabilities = self.table.revenue, self.table.probability
+        before = ((revenues > revenue)
+                  | ((revenues == revenue) & (probabilities >= probability)))
+        position = int(np.count_nonzero(before))
+        if exclude is not None and before[exclude]:
+            position -= 1
+        return position
+
+    def insert(self, product_id: Hashable, revenue: float,
+               probability: float):
+        """It adds a product.
+
+        Parameters
+        ----------
+            product_id: Hashable
+                Id of the new product.
+            revenue: float
+                Revenue of the product.
+            probability: float
+                Probability of the product.
+        """
+
+        if product_id in self._rows:
+            raise KeyError(f"Product {product_id!r} is already ranked.")
+
+        position = self._position(revenue, probability)
+        self.ids.insert(position, product_id)
+        self._reindex(position, len(self.ids))
+        self.table.insert(position, revenue, probability)
+        self._ranking = None
+
+    def remove(self, product_id: Hashable):
+        """It removes a product.
+
+        Parameters
+        ----------
+            product_id: Hashable
+                Id of the product.
+        """
+
+        position = self._row(product_id)
+        del self.ids[position]
+        del self._rows[product_id]
+        self._reindex(position, len(self.ids))
+        self.table.delete(position)
+        self._ranking = None
+
+    def update(self, product_id: Hashable, revenue: float = None,
+               probability: float = None):
+        """It changes the revenue and/or probability of a product.
+
+        Parameters
+        ----------
+            product_id: Hashable
+                Id of the product.
+            revenue: optional, float
+                New revenue, by default it is not changed.
+            probability: optional, float
+                New probability, by default it is not changed.
+        """
+
+        old = self._row(product_id)
+        if revenue is None:
+            revenue = float(self.table.revenue[old])
+        if probability is None:
+            probability = float(self.table.probability[old])
+
+        new = self._position(revenue, probability, exclude=old)
+        if new < old:
+            self.ids[new + 1:old + 1] = self.ids[new:old]
+        elif new > old:
+            self.ids[old:new] = self.ids[old + 1:new + 1]
+        self.ids[new] = product_id
+        self._reindex(min(old, new), max(old, new) + 1)
+        self.table.move(old, new, revenue, probability)
+        self._ranking = None
+
+    def ranking(self, show_xs: bool = True) -> Union[Products,
+                                                     Tuple[Products, List]]:
+        """The best-x ranking of the current products.
+
+        It is the same ranking as best_x.best_x_full_capacity, up to
+        the order of products with equal key.
+
+        Parameters
+        ----------
+            show_xs: bool, optional, default: True
+                Should the list of "best-x"'s chosen be returned?
+
+        Returns
+        -------
+            full_ranking: Products
+                Ranking of products.
+            best_xs: list, optional
+                List of xs' values chosen by the algorithm.
+        """
+
+        if self._ranking is None:
+            positions, best_xs = table_rounds(self.table.copy(), self.g,
+                                              self.capacity)
+            self._ranking = self.products.take(positions), best_xs
+
+        full_ranking, best_xs = self._ranking
+        if show_xs:
+            return full_ranking, list(best_xs)
+
+        return full_ranking
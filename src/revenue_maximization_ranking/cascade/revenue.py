@@ -4,26 +4,38 @@ Functions
 ----------
     expected_revenue:
         It calculates the expected revenue of a ranking.
+    expected_revenues:
+        It calculates the expected revenues of many rankings at once.
+    revenue_matrix:
+        It calculates the expected revenue of many rankings under many
+        distributions of attention spans.
 """
 
-from typing import Iterable
+import numpy as np
+from typing import Iterable, Sequence, Union
+from revenue_maximization_ranking.cascade.attention import survival, \
+                                                           survival_stack
+from revenue_maximization_ranking.cascade.products import Products
 from revenue_maximization_ranking._types import DistributionLike
 
-__all__ = ["expected_revenue"]
+__all__ = ["expected_revenue", "expected_revenues", "revenue_matrix"]
 
 
-def expected_revenue(ranked_products: Iterable, g: DistributionLike) -> float:
+def expected_revenue(ranked_products: Union[Iterable, Products],
+                     g: DistributionLike) -> float:
     """It calculates the expected revenue of a ranking.
 
     Parameters
     ----------
-        ranked_products: Iterable
+        ranked_products: Iterable or Products
             An iterable object of tuples which represents products, the
             first element in the tuple should be an id and the second
             element a dictionary with the revenue and probability of
-            the product.
+            the product. Ranked Products are evaluated with arrays.
         g: DistributionLike
-            Distribution of the customers' attention spans.
+            Distribution of the customers' attention spans, an array
+            of attention probabilities is also accepted (see
+            attention.survival).
 
     Returns
     -------
@@ -32,13 +44,102 @@ def expected_revenue(ranked_products: Iterable, g: DistributionLike) -> float:
             attention spans.
     """
 
+    if isinstance(ranked_products, Products):
+        return float(expected_revenues(ranked_products.revenue,
+                                       ranked_products.probability, g))
+
+    ranked_products = list(ranked_products)
+    attention = survival(g, len(ranked_products))
     negative_cumm_prob = 1.0
     revenue = 0.0
     for i, product in enumerate(ranked_products):
         prob = product[1]["probability"]
         revenue += (negative_cumm_prob * prob
                     * product[1]["revenue"]
-                    * (g.sf(i + 1) + g.pmf(i + 1)))
+                    * attention[i])
         negative_cumm_prob *= (1 - prob)
 
-    return revenue
+    return float(revenue)
+
+
+def expected_revenues(revenue: np.ndarray, probability: np.ndarray,
+                      g: DistributionLike) -> Union[float, np.ndarray]:
+    """It calculates the expected revenues of many rankings at once.
+
+    The probability of a customer reaching position i is the product
+    of (1 - p) over the previous positions, so the expected revenue is
+    the sum over positions of that reach times p * r * G(i).
+
+    Each row of the arrays is a ranking: the revenues and probabilities
+    of its products in ranking order. Rankings of different lengths
+    (for instance different searches) can be padded with zeros at the
+    end, padded positions add nothing to the revenue. To compare many
+    rankings of the same products index the products arrays with the
+    rankings, e.g. expected_revenues(revenue[rankings],
+    probability[rankings], g).
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            One or two dimensional array with the revenues of the
+            ranked products.
+        probability: numpy.ndarray
+            Array of the same shape with their probabilities.
+        g: DistributionLike
+            Distribution of the customers' attention spans, an array
+            of attention probabilities is also accepted (see
+            attention.survival).
+
+    Returns
+    -------
+        revenue: float or numpy.ndarray
+            Expected revenue of each ranking, a scalar for one
+            dimensional inputs.
+    """
+
+    revenue = np.asarray(revenue, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    attention = survival(g, probability.shape[-1])
+    reach = np.ones_like(probability)
+    np.cumprod(1.0 - probability[..., :-1], axis=-1, out=reach[..., 1:])
+    return np.sum(reach * probability * revenue * attention, axis=-1)
+
+
+def revenue_matrix(revenue: np.ndarray, probability: np.ndarray,
+                   gs: Union[Sequence, np.ndarray]) -> np.ndarray:
+    """It calculates the expected revenue of many rankings under many
+    distributions of attention spans.
+
+    The expected revenue is linear in G: it is the sum over positions
+    i of reach * p * r at i times G(i). The weights of every ranking
+    are computed once and multiplied by the stack of survival vectors,
+    so the whole matrix is a single matrix product.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            One or two dimensional array with the revenues of the
+            ranked products, as in expected_revenues.
+        probability: numpy.ndarray
+            Array of the same shape with their probabilities.
+        gs: sequence or numpy.ndarray
+            Distributions of attention spans or a two dimensional
+            array of survival vectors (see attention.survival_stack).
+
+    Returns
+    -------
+        revenues: numpy.ndarray
+            Array of shape (n_rankings, n_distributions) with the
+            expected revenue of each ranking under each distribution,
+            of shape (n_distributions,) for one dimensional inputs.
+    """
+
+    revenue = np.asarray(revenue, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    if revenue.shape != probability.shape or revenue.ndim not in (1, 2):
+        raise ValueError("revenue and probability must be one or two "
+                         "dimensional and of the same shape.")
+    attention = survival_stack(gs, probability.shape[-1])
+    reach = np.ones_like(probability)
+    np.cumprod(1.0 - probability[..., :-1], axis=-1, out=reach[..., 1:])
+    return (reach * probability * revenue) @ attention.T
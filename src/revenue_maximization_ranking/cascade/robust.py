@@ -0,0 +1,253 @@
+"""Robust rankings under uncertain purchase probabilities.
+
+The probabilities of the products are estimates, so the ranking that
+is optimal for the estimates may be poor for the true probabilities.
+Here K scenarios of the probabilities are sampled (from Beta
+posteriors or from standard errors), the best-x round is solved for
+every scenario and each distinct ranking found is evaluated under all
+the scenarios. The ranking with the largest mean, or quantile, of the
+expected revenue over the scenarios is chosen.
+
+The K dynamic programming tables are filled together: products are
+sorted once by revenue, which is a valid Lemma 1 order in every
+scenario (products with equal revenue can be ranked in any order
+without changing the expected revenue), and each row of the table is
+updated for the K scenarios with a single numpy operation. Decisions
+are stored as bits, N * K * (M + 1) / 8 bytes.
+
+Functions
+---------
+    sample_probabilities:
+        It samples scenarios of the purchase probabilities.
+    scenario_tables:
+        It fills the fixed attention table of every scenario at once.
+    scenario_assortments:
+        It rebuilds the optimal assortment of every scenario.
+    robust_best_x:
+        The best-x ranking with the largest mean or quantile of the
+        expected revenue over the scenarios.
+"""
+
+import numpy as np
+from collections import namedtuple
+from typing import Dict, Tuple, Union
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking.cascade.attention import survival
+from revenue_maximization_ranking.cascade.best_x import choose_x
+from revenue_maximization_ranking.cascade.fixed_attention import dp_table, \
+                                                                backtrack
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
+from revenue_maximization_ranking.cascade.revenue import expected_revenues
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["sample_probabilities", "robust_best_x", "RobustResult"]
+
+RobustResult = namedtuple("RobustResult", ["ranking", "score", "revenues",
+                                           "n_candidates"])
+
+
+def sample_probabilities(k: int, probability: np.ndarray = None,
+                         std: np.ndarray = None, alpha: np.ndarray = None,
+                         beta: np.ndarray = None, seed=None) -> np.ndarray:
+    """It samples scenarios of the purchase probabilities.
+
+    Either alpha and beta, the parameters of a Beta posterior of each
+    probability (e.g. purchases + 1 and views - purchases + 1), or
+    probability and std, the estimates and their standard errors, must
+    be given. Normal samples are clipped to [0, 1].
+
+    Parameters
+    ----------
+        k: int
+            Number of scenarios.
+        probability: optional, numpy.ndarray
+            Estimated probability of each product.
+        std: optional, numpy.ndarray
+            Standard error of each estimate.
+        alpha: optional, numpy.ndarray
+            First parameter of the Beta posterior of each product.
+        beta: optional, numpy.ndarray
+            Second parameter of the Beta posterior of each product.
+        seed: optional, int or numpy.random.Generator
+            Seed of the samples.
+
+    Returns
+    -------
+        scenarios: numpy.ndarray
+            Array of shape (k, n_products), one scenario per row.
+    """
+
+    rng = np.random.default_rng(seed)
+    if alpha is not None and beta is not None:
+        alpha = np.asarray(alpha, dtype=np.float64)
+        beta = np.asarray(beta, dtype=np.float64)
+        return rng.beta(alpha, beta, size=(k,) + alpha.shape)
+
+    if probability is not None and std is not None:
+        probability = np.asarray(probability, dtype=np.float64)
+        scenarios = rng.normal(probability, std,
+                               size=(k,) + probability.shape)
+        return np.clip(scenarios, 0.0, 1.0, out=scenarios)
+
+    raise ValueError("Either alpha and beta or probability and std must be "
+                     "given.")
+
+
+def scenario_tables(revenue: np.ndarray, scenarios: np.ndarray,
+                    capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+    """It fills the fixed attention table of every scenario at once.
+
+    This is the recursion of fixed_attention.dp_table with an extra
+    dimension for the scenarios.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            Revenues of the products sorted in decreasing order.
+        scenarios: numpy.ndarray
+            Array of shape (k, n_products) with the probabilities of
+            the products in the same order for each scenario.
+        capacity: int
+            Maximum attention span to be solved.
+
+    Returns
+    -------
+        h, choice: tuple[ndarray, ndarray]
+            h[s, k] is the optimal revenue of scenario s for attention
+            span k. choice[j, s] holds the decisions of product j in
+            scenario s packed as bits (see numpy.packbits), bit k is
+            set when product j is added at cell (j, k) of the table.
+    """
+
+    n_scenarios, n_products = scenarios.shape
+    profiling.count("dp_cells", n_scenarios * n_products * capacity)
+    by_product = np.ascontiguousarray(scenarios.T, dtype=np.float64)
+    choice = np.zeros((n_products, n_scenarios, (capacity + 1 + 7) // 8),
+                      dtype=np.uint8)
+    h = np.zeros((n_scenarios, capacity + 1), dtype=np.float64)
+    take = np.zeros((n_scenarios, capacity + 1), dtype=bool)
+    with profiling.stage("dp"):
+        for j in range(n_products - 1, -1, -1):
+            probability = by_product[j][:, None]
+            alternative = h[:, :-1] + probability * (revenue[j] - h[:, :-1])
+            np.greater_equal(alternative, h[:, 1:], out=take[:, 1:])
+            choice[j] = np.packbits(take, axis=-1)
+            np.copyto(h[:, 1:], alternative, where=take[:, 1:])
+
+    return h, choice
+
+
+def scenario_assortments(choice: np.ndarray, xs: np.ndarray) -> np.ndarray:
+    """It rebuilds the optimal assortment of every scenario.
+
+    Parameters
+    ----------
+        choice: numpy.ndarray
+            Packed decisions returned by scenario_tables.
+        xs: numpy.ndarray
+            Attention span of the assortment of each scenario.
+
+    Returns
+    -------
+        members: numpy.ndarray
+            Boolean array of shape (k, n_products), members[s, j] is
+            True when product j is in the assortment of scenario s.
+    """
+
+    n_products, n_scenarios, _ = choice.shape
+    scenarios = np.arange(n_scenarios)
+    k = np.asarray(xs, dtype=np.intp).copy()
+    members = np.zeros((n_scenarios, n_products), dtype=bool)
+    with profiling.stage("backtrack"):
+        for j in range(n_products):
+            bits = choice[j, scenarios, k >> 3] >> (7 - (k & 7))
+            take = (bits & 1).astype(bool) & (k > 0)
+            members[:, j] = take
+            k -= take
+
+    return members
+
+
+def robust_best_x(products: Union[Dict, Products], g: DistributionLike,
+                  capacity: int, scenarios: np.ndarray,
+                  quantile: float = None) -> RobustResult:
+    """The best-x ranking with the largest mean or quantile of the
+    expected revenue over the scenarios.
+
+    The candidates are the best-x rankings of every scenario and of
+    the given probabilities. Each candidate is evaluated under every
+    scenario and the one with the best score is returned.
+
+    Parameters
+    ----------
+        products: dict or Products
+            Set of products, keys must be the product ids and values
+            must be dictionaries with the revenue and probability of
+            each product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int
+            Maximum number of items that the retailer can display.
+        scenarios: numpy.ndarray
+            Array of shape (k, n_products) with the probabilities of
+            the products, in the order of products, for each scenario
+            (see sample_probabilities).
+        quantile: optional, float
+            If given the score of a ranking is this quantile of its
+            expected revenues over the scenarios, otherwise their mean.
+
+    Returns
+    -------
+        result: RobustResult
+            The chosen ranking (Products when the products are given as
+            Products), its score, its expected revenue under each
+            scenario and the number of distinct candidates evaluated.
+    """
+
+    prods = as_products(products)
+    scenarios = np.asarray(scenarios, dtype=np.float64)
+    if scenarios.ndim != 2 or scenarios.shape[1] != len(prods):
+        raise ValueError("scenarios must have a column per product.")
+    if scenarios.shape[0] == 0:
+        raise ValueError("At least one scenario is required.")
+
+    order = prods.key_order()
+    revenue, probability = prods.revenue[order], prods.probability[order]
+    scenarios = scenarios[:, order]
+    max_x = min(len(prods), capacity)
+
+    h, choice = scenario_tables(revenue, scenarios, max_x)
+    xs = np.zeros(scenarios.shape[0], dtype=np.intp)
+    if max_x:
+        with profiling.stage("choose_x"):
+            lower_bounds = h[:, 1:] * survival(g, max_x)
+            best = np.argmax(lower_bounds, axis=1)
+            positive = lower_bounds[np.arange(best.shape[0]), best] > 0.0
+            xs = np.where(positive, best + 1, 0)
+    members = scenario_assortments(choice, xs)
+
+    nominal_h, nominal_choice = dp_table(revenue, probability, max_x)
+    nominal = np.zeros((1, len(prods)), dtype=bool)
+    nominal[0, backtrack(nominal_choice, choose_x(nominal_h, g))] = True
+    candidates = np.unique(np.concatenate((nominal, members)), axis=0)
+
+    best = None
+    for candidate in candidates:
+        # Products are sorted by the Lemma 1 key of the given
+        # probabilities, so members are already in ranking order.
+        picked = np.flatnonzero(candidate)
+        revenues = expected_revenues(
+            np.broadcast_to(revenue[picked], (scenarios.shape[0],
+                                              picked.shape[0])),
+            scenarios[:, picked], g)
+        score = float(np.mean(revenues) if quantile is None
+                      else np.quantile(revenues, quantile))
+        if best is None or score > best[0]:
+            best = score, picked, revenues
+
+    score, picked, revenues = best
+    ranking = match_format(prods.take(order[picked]), products)
+    return RobustResult(ranking, score, revenues, candidates.shape[0])
@@ -0,0 +1,255 @@
+"""Asyncio ranking with request micro-batching.
+
+Solving a ranking inline in a coroutine blocks the event loop. An
+AsyncRanker instead collects the requests that arrive within a short
+window, hands them as one batch to an executor (a thread by default, or
+a process pool) and resolves every request's future as soon as its
+batch is solved.
+
+Each request is still solved on its own inside the batch, batching only
+saves executor round trips. With the default single thread this keeps
+the event loop free but gives no throughput gain over solving the
+requests one by one and adds up to window seconds of latency. Pass a
+ProcessPoolExecutor (and chunks equal to its number of workers) to
+solve a batch in parallel. Every part of a batch sends each distinct
+distribution of attention spans once, not once per request.
+
+Example:
+
+    async with AsyncRanker(window=0.002) as ranker:
+        ranking, best_xs = await ranker.rank(products, g, capacity)
+
+Classes
+-------
+    AsyncRanker:
+        Micro-batching asyncio front end for best_x_full_capacity.
+"""
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+from revenue_maximization_ranking.cascade.attention import distribution_key
+from revenue_maximization_ranking.cascade.parallel import rank_arrays
+from revenue_maximization_ranking.cascade.products import Products, \
+                                                         as_products, \
+                                                         match_format
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["AsyncRanker"]
+
+ServiceStats = namedtuple("ServiceStats", ["requests", "batches",
+                                           "queue_depth", "in_flight",
+                                           "mean_batch_size",
+                                           "max_batch_size"])
+
+
+def batch_payload(tasks: List[Tuple]) -> Tuple[List, List]:
+    """It replaces the distributions of a batch by indices.
+
+    Equal distributions (see attention.distribution_key) are sent once.
+
+    Parameters
+    ----------
+        tasks: list
+            Tuples with the revenues, probabilities, distribution of
+            attention spans and capacity of each product set.
+
+    Returns
+    -------
+        distributions, tasks: tuple[list, list]
+            The distinct distributions and the tasks with the index of
+            their distribution instead of the distribution.
+    """
+
+    indices = {}
+    distributions = []
+    indexed = []
+    for revenue, probability, g, capacity in tasks:
+        key = distribution_key(g)
+        if key not in indices:
+            indices[key] = len(distributions)
+            distributions.append(g)
+        indexed.append((revenue, probability, indices[key], capacity))
+
+    return distributions, indexed
+
+
+def rank_batch(distributions: List, tasks: List[Tuple]) -> List:
+    """It ranks a batch of product sets.
+
+    Parameters
+    ----------
+        distributions: list
+            Distributions of attention spans of the batch.
+        tasks: list
+            Tuples with the revenues, probabilities, index of the
+            distribution of attention spans and capacity of each
+            product set, see batch_payload.
+
+    Returns
+    -------
+        results: list
+            For each task a tuple with the positions of the ranked
+            products and the xs chosen, or the exception raised.
+    """
+
+    results = []
+    for revenue, probability, index, capacity in tasks:
+        try:
+            results.append(rank_arrays(revenue, probability,
+                                       distributions[index], capacity))
+        except Exception as error:
+            results.append(error)
+
+    return results
+
+
+class AsyncRanker:
+    """Micro-batching asyncio front end for best_x_full_capacity.
+
+    Parameters
+    ----------
+        window: float, default 0.002
+            Seconds to wait for more requests after the first request
+            of a batch arrives.
+        max_batch_size: int, default 64
+            A batch is sent right away when it reaches this size.
+        executor: optional, concurrent.futures.Executor
+            Where batches are solved, by default a single thread owned
+            by the ranker, which keeps the event loop free but gives no
+            speedup from batching. With a process pool batches are
+            solved in parallel and only numpy arrays, the distinct
+            distributions and the capacities are sent to the workers.
+        chunks: int, default 1
+            Each batch is split in this many parts submitted to the
+            executor at once, useful with pools of several workers.
+
+    Attributes
+    ----------
+        requests, batches: int
+            Number of requests received and of batches sent.
+    """
+
+    def __init__(self, window: float = 0.002, max_batch_size: int = 64,
+                 executor: Executor = None, chunks: int = 1):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.chunks = chunks
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.requests = 0
+        self.batches = 0
+        self._batched = 0
+        self._largest_batch = 0
+        self._in_flight = 0
+
+    async def __aenter__(self) -> "AsyncRanker":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for their batch to be sent."""
+        return len(self._pending)
+
+    def stats(self) -> ServiceStats:
+        """Request, queue and batch size metrics."""
+        mean = self._batched / self.batches if self.batches else 0.0
+        return ServiceStats(self.requests, self.batches, self.queue_depth,
+                            self._in_flight, mean, self._largest_batch)
+
+    async def rank(self, products: Union[Dict, Products],
+                   g: DistributionLike, capacity: int = 0) -> Tuple:
+        """It ranks a set of products with the best-x strategy.
+
+        Parameters
+        ----------
+            products: dict or Products
+                Set of products, keys must be the product ids and
+                values must be dictionaries with the revenue and
+                probability of each product.
+            g: DistributionLike
+                Distribution of attention spans, an array of attention
+                probabilities is also accepted.
+            capacity: int, default 0
+                Maximum number of items that the retailer can display,
+                if lower than 1 the number of products is used.
+
+        Returns
+        -------
+            full_ranking, best_xs: tuple
+                As returned by best_x.best_x_full_capacity.
+        """
+
+        loop = asyncio.get_running_loop()
+        prods = as_products(products)
+        if capacity < 1:
+            capacity = len(prods)
+
+        future = loop.create_future()
+        self._pending.append(((prods.revenue, prods.probability, g, capacity),
+                              future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        positions, best_xs = await future
+        return match_format(prods.take(positions), products), best_xs
+
+    def _flush(self):
+        """It sends the pending requests as a batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        self._batched += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        task = asyncio.ensure_future(self._solve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _solve(self, batch: List[Tuple]):
+        """It solves a batch in the executor and resolves its futures."""
+        loop = asyncio.get_running_loop()
+        size = -(-len(batch) // max(self.chunks, 1))
+        parts = [batch[i:i + size] for i in range(0, len(batch), size)]
+        self._in_flight += len(batch)
+        try:
+            solved = await asyncio.gather(*[
+                loop.run_in_executor(self._executor, rank_batch,
+                                     *batch_payload([task for task, _
+                                                     in part]))
+                for part in parts], return_exceptions=True)
+        finally:
+            self._in_flight -= len(batch)
+
+        for part, results in zip(parts, solved):
+            if isinstance(results, BaseException):
+                results = [results] * len(part)
+            for (_, future), result in zip(part, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def close(self):
+        """It solves the pending requests and releases the executor."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
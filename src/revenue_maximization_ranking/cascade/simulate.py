@@ -0,0 +1,199 @@
+"""Monte Carlo simulation of the cascade model.
+
+Customer sessions are simulated in large numpy batches: each customer
+draws an attention span from g and, for every position of the ranking,
+whether they would purchase the product displayed there once they see
+it. The customer buys the first product they would purchase if its
+position is within their attention span, and nothing otherwise.
+
+Sessions are processed in chunks of a fixed size and only the running
+mean and variance of the revenue are kept, so memory is bounded by the
+chunk whatever the number of sessions. Several rankings are evaluated
+on the same simulated customers (common random numbers), which makes
+differences between them more precise than separate simulations.
+
+Functions
+---------
+    simulate_revenue:
+        It estimates the expected revenue of a ranking by simulation.
+    simulate_revenues:
+        It estimates the expected revenues of many rankings at once.
+"""
+
+import numpy as np
+from collections import namedtuple
+from statistics import NormalDist
+from typing import Iterable, Union
+from revenue_maximization_ranking.cascade.attention import survival
+from revenue_maximization_ranking.cascade.products import Products
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["simulate_revenue", "simulate_revenues", "SimulationResult"]
+
+SimulationResult = namedtuple("SimulationResult", ["mean", "std", "low",
+                                                   "high", "sessions"])
+
+
+def attention_spans(g: DistributionLike, size: int, length: int,
+                    rng: np.random.Generator) -> np.ndarray:
+    """It draws attention spans of customers.
+
+    Distributions with a rvs method (like scipy.stats frozen
+    distributions) are sampled directly. Otherwise spans are drawn
+    from G(x) = Prob(X >= x) truncated at length, which is all that
+    matters for rankings of that length.
+
+    Parameters
+    ----------
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        size: int
+            Number of customers.
+        length: int
+            Length of the rankings.
+        rng: numpy.random.Generator
+            Source of random numbers.
+
+    Returns
+    -------
+        spans: numpy.ndarray
+            Attention span of each customer.
+    """
+
+    if not isinstance(g, np.ndarray) and hasattr(g, "rvs"):
+        return np.asarray(g.rvs(size=size, random_state=rng))
+
+    # Prob(count(G > U) >= x) = Prob(U < G(x)) = G(x) as G decreases.
+    attention = survival(g, length)
+    return np.searchsorted(-attention, -rng.random(size), side="left")
+
+
+def simulate_revenues(revenue: np.ndarray, probability: np.ndarray,
+                      g: DistributionLike, sessions: int = 10**6,
+                      chunk_size: int = 2**16, seed=None,
+                      confidence: float = 0.95) -> SimulationResult:
+    """It estimates the expected revenues of many rankings at once.
+
+    Arrays follow the layout of revenue.expected_revenues: each row is
+    a ranking and shorter rankings are padded with zeros at the end.
+
+    Parameters
+    ----------
+        revenue: numpy.ndarray
+            One or two dimensional array with the revenues of the
+            ranked products.
+        probability: numpy.ndarray
+            Array of the same shape with their probabilities.
+        g: DistributionLike
+            Distribution of the customers' attention spans, an array
+            of attention probabilities is also accepted (see
+            attention.survival).
+        sessions: int, default 10**6
+            Number of customer sessions simulated.
+        chunk_size: int, default 2**16
+            Number of sessions simulated at a time, memory grows with
+            chunk_size times the length of the rankings.
+        seed: optional, int or numpy.random.Generator
+            Seed of the simulation, for reproducible results.
+        confidence: float, default 0.95
+            Level of the confidence intervals.
+
+    Returns
+    -------
+        result: SimulationResult
+            Mean revenue per session, standard deviation of the revenue
+            of a session, bounds of the (normal approximation)
+            confidence interval of the mean and number of sessions.
+            Scalars for one dimensional inputs, otherwise arrays with
+            a value per ranking.
+    """
+
+    revenue = np.asarray(revenue, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    if revenue.shape != probability.shape or revenue.ndim not in (1, 2):
+        raise ValueError("revenue and probability must be one or two "
+                         "dimensional and of the same shape.")
+    if sessions < 1 or chunk_size < 1:
+        raise ValueError("sessions and chunk_size must be positive.")
+
+    revenues = np.atleast_2d(revenue)
+    probabilities = np.atleast_2d(probability)
+    if revenues.shape[1] == 0:
+        # An empty ranking is a ranking of products never purchased.
+        revenues = probabilities = np.zeros((revenues.shape[0], 1))
+    n_rankings, length = revenues.shape
+    rng = np.random.default_rng(seed)
+
+    count = 0
+    mean = np.zeros(n_rankings)
+    m2 = np.zeros(n_rankings)
+    while count < sessions:
+        size = min(chunk_size, sessions - count)
+        spans = attention_spans(g, size, length, rng)
+        uniforms = rng.random((size, length))
+        rows = np.arange(size)
+        total = count + size
+        for k in range(n_rankings):
+            purchases = uniforms < probabilities[k]
+            first = np.argmax(purchases, axis=1)
+            bought = purchases[rows, first] & (first + 1 <= spans)
+            values = np.where(bought, revenues[k, first], 0.0)
+
+            # Chan et al. update of the mean and sum of squares.
+            chunk_mean = values.mean()
+            delta = chunk_mean - mean[k]
+            mean[k] += delta * size / total
+            m2[k] += (np.sum((values - chunk_mean) ** 2)
+                      + delta ** 2 * count * size / total)
+        count = total
+
+    std = np.sqrt(m2 / max(count - 1, 1))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * std / np.sqrt(count)
+    result = SimulationResult(mean, std, mean - half_width,
+                              mean + half_width, count)
+    if revenue.ndim == 1:
+        return SimulationResult(*(float(value[0]) for value in result[:4]),
+                                count)
+
+    return result
+
+
+def simulate_revenue(ranked_products: Union[Iterable, Products],
+                     g: DistributionLike, sessions: int = 10**6,
+                     chunk_size: int = 2**16, seed=None,
+                     confidence: float = 0.95) -> SimulationResult:
+    """It estimates the expected revenue of a ranking by simulation.
+
+    Parameters
+    ----------
+        ranked_products: Iterable or Products
+            An iterable object of tuples which represents products, the
+            first element in the tuple should be an id and the second
+            element a dictionary with the revenue and probability of
+            the product.
+        g: DistributionLike
+            Distribution of the customers' attention spans.
+        sessions, chunk_size, seed, confidence: optional
+            See simulate_revenues.
+
+    Returns
+    -------
+        result: SimulationResult
+            Mean revenue per session, standard deviation, confidence
+            interval of the mean and number of sessions.
+    """
+
+    if isinstance(ranked_products, Products):
+        revenue = ranked_products.revenue
+        probability = ranked_products.probability
+    else:
+        ranked_products = list(ranked_products)
+        revenue = [product["revenue"] for _, product in ranked_products]
+        probability = [product["probability"]
+                       for _, product in ranked_products]
+
+    return simulate_revenues(revenue, probability, g, sessions=sessions,
+                             chunk_size=chunk_size, seed=seed,
+                             confidence=confidence)
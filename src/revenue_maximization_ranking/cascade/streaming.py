@@ -0,0 +1,273 @@
+"""Out-of-core ranking of grouped catalogs.
+
+full_best_x_grouped needs the whole catalog in one dataframe. When the
+catalog (for instance every product of every search) does not fit in
+memory, the functions in this module stream it instead: rows are read
+a chunk at a time, every group is ranked as soon as all of its rows
+have been read and its ranks are written right away to the output.
+Peak memory is bounded by the chunk size plus the largest group, not
+by the size of the catalog.
+
+The rows of each group must be contiguous, for instance a catalog
+sorted by group. Groups are identified by a single column and must not
+be null. As in full_best_x_grouped, each group is ranked on its own and
+products left out of the ranking of their group get NaN.
+
+Functions
+---------
+    rank_memmap:
+        It ranks the groups of a catalog stored as (memory mapped)
+        numpy arrays.
+    rank_parquet:
+        It ranks the groups of a parquet catalog into a new parquet
+        file, it requires pyarrow.
+"""
+
+import numpy as np
+from typing import List, Set, Union
+from revenue_maximization_ranking.cascade import profiling
+from revenue_maximization_ranking.cascade.parallel import rank_arrays
+from revenue_maximization_ranking._types import DistributionLike
+
+__all__ = ["rank_memmap", "rank_parquet"]
+
+
+def rank_groups(groups: np.ndarray, revenue: np.ndarray,
+                probability: np.ndarray, g: DistributionLike,
+                capacity: int, seen: Set) -> np.ndarray:
+    """It ranks every group of some complete groups of rows.
+
+    Parameters
+    ----------
+        groups: numpy.ndarray
+            Group of each row, rows of a group must be contiguous.
+        revenue: numpy.ndarray
+            Revenue of each row.
+        probability: numpy.ndarray
+            Probability of each row.
+        g: DistributionLike
+            Distribution of attention spans.
+        capacity: int
+            Maximum number of products displayed for each group, if
+            lower than 1 the size of the group is used.
+        seen: set
+            Groups already ranked, it is updated.
+
+    Returns
+    -------
+        ranks: numpy.ndarray
+            Rank of each row within its group, NaN if left out.
+    """
+
+    ranks = np.full(groups.shape[0], np.nan)
+    if groups.shape[0] == 0:
+        return ranks
+
+    revenue = np.asarray(revenue, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    bounds = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [groups.shape[0]]))
+    profiling.count("groups", starts.shape[0])
+    for start, end in zip(starts, ends):
+        group = groups[start]
+        if group in seen:
+            raise ValueError(f"The rows of group {group!r} are not "
+                             "contiguous.")
+        seen.add(group)
+        set_capacity = capacity if capacity >= 1 else end - start
+        positions, _ = rank_arrays(revenue[start:end],
+                                   probability[start:end], g, set_capacity)
+        ranks[start + positions] = np.arange(1, positions.shape[0] + 1)
+
+    return ranks
+
+
+def _as_array(array: Union[str, np.ndarray]) -> np.ndarray:
+    """Arrays are kept as they are, paths of .npy files are mapped."""
+    if isinstance(array, str):
+        return np.load(array, mmap_mode="r")
+
+    return array
+
+
+def rank_memmap(groups: Union[str, np.ndarray],
+                revenue: Union[str, np.ndarray],
+                probability: Union[str, np.ndarray], g: DistributionLike,
+                capacity: int = 0, out: Union[str, np.ndarray] = None,
+                chunk_size: int = 2**20) -> np.ndarray:
+    """It ranks the groups of a catalog stored as numpy arrays.
+
+    The arrays are read a chunk at a time, so they can be memory mapped
+    (e.g. numpy.load(path, mmap_mode="r")) and larger than memory.
+
+    Parameters
+    ----------
+        groups: str or numpy.ndarray
+            Group of each row, or the path of a .npy file with them.
+        revenue: str or numpy.ndarray
+            Revenue of each row, or the path of a .npy file.
+        probability: str or numpy.ndarray
+            Probability of each row, or the path of a .npy file.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int, default 0
+            Maximum number of products that the retailer can display
+            for each group, if lower than 1 the size of the group is
+            used.
+        out: optional, str or numpy.ndarray
+            Float array where the ranks are written, or the path of the
+            .npy file to create. By default a new array in memory.
+        chunk_size: int, default 2**20
+            Number of rows read at a time, chunks are extended up to
+            the end of their last group.
+
+    Returns
+    -------
+        ranks: numpy.ndarray
+            The out array, with the rank of each row within its group
+            and NaN for products left out of the ranking.
+    """
+
+    groups, revenue, probability = map(_as_array,
+                                       (groups, revenue, probability))
+    n_rows = groups.shape[0]
+    if not revenue.shape[0] == probability.shape[0] == n_rows:
+        raise ValueError("groups, revenue and probability must be of the "
+                         "same length.")
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=np.float64,
+                                        shape=(n_rows,))
+    elif out is None:
+        out = np.empty(n_rows, dtype=np.float64)
+
+    seen = set()
+    start = 0
+    while start < n_rows:
+        with profiling.stage("load"):
+            stop = min(start + chunk_size, n_rows)
+            # The chunk is extended while its last group goes on.
+            while stop < n_rows:
+                window = np.asarray(groups[stop - 1:stop + chunk_size])
+                changes = np.flatnonzero(window[1:] != window[:-1])
+                if changes.shape[0]:
+                    stop += int(changes[0])
+                    break
+                stop += window.shape[0] - 1
+
+            chunk_groups = np.asarray(groups[start:stop])
+            chunk_revenue = np.asarray(revenue[start:stop])
+            chunk_probability = np.asarray(probability[start:stop])
+
+        ranks = rank_groups(chunk_groups, chunk_revenue, chunk_probability,
+                            g, capacity, seen)
+        with profiling.stage("output"):
+            out[start:stop] = ranks
+        start = stop
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+
+
+def rank_parquet(source: str, destination: str, group_col: str,
+                 revenue_col: str, probability_col: str,
+                 g: DistributionLike, capacity: int = 0,
+                 rank_col: str = "rank", keep_cols: List[str] = None,
+                 batch_size: int = 2**16):
+    """It ranks the groups of a parquet catalog into a new parquet file.
+
+    The source is read in record batches and the destination is written
+    a batch of complete groups at a time, with the rows in the same
+    order as the source. This function requires pyarrow.
+
+    Parameters
+    ----------
+        source: str
+            Path of the parquet file with the products of every group.
+        destination: str
+            Path of the parquet file to be written.
+        group_col: str
+            Name of the column identifying each group.
+        revenue_col: str
+            Name of the column with the revenue of each product.
+        probability_col: str
+            Name of the column with the conditional probability of each
+            product.
+        g: DistributionLike
+            Distribution of attention spans, an array of attention
+            probabilities is also accepted (see attention.survival).
+        capacity: int, default 0
+            Maximum number of products that the retailer can display
+            for each group, if lower than 1 the size of the group is
+            used.
+        rank_col: str, default "rank"
+            Name of the rank column in the destination.
+        keep_cols: optional, list
+            Columns of the source copied to the destination, by default
+            only the group column.
+        batch_size: int, default 2**16
+            Number of rows read at a time.
+    """
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("rank_parquet requires pyarrow, install it with "
+                          "pip install pyarrow.") from error
+
+    keep_cols = [group_col] if keep_cols is None else list(keep_cols)
+    columns = list(dict.fromkeys([group_col, revenue_col, probability_col]
+                                 + keep_cols))
+    parquet_file = pq.ParquetFile(source)
+    schema = pa.schema([parquet_file.schema_arrow.field(name)
+                        for name in keep_cols]
+                       + [pa.field(rank_col, pa.float64())])
+    seen = set()
+
+    def write(batches: List, writer):
+        table = pa.Table.from_batches(batches)
+        ranks = rank_groups(
+            table.column(group_col).to_numpy(),
+            table.column(revenue_col).to_numpy(),
+            table.column(probability_col).to_numpy(), g, capacity, seen)
+        with profiling.stage("output"):
+            writer.write_table(table.select(keep_cols)
+                               .append_column(rank_col, pa.array(ranks)))
+
+    writer = pq.ParquetWriter(destination, schema)
+    try:
+        pending = []
+        pending_group = None
+        batches = parquet_file.iter_batches(batch_size=batch_size,
+                                            columns=columns)
+        while True:
+            with profiling.stage("load"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            if batch.num_rows == 0:
+                continue
+
+            groups = batch.column(batch.schema.get_field_index(group_col))\
+                .to_numpy(zero_copy_only=False)
+            changes = np.flatnonzero(groups[1:] != groups[:-1])
+            last_start = int(changes[-1]) + 1 if changes.shape[0] else 0
+            if last_start == 0 and pending and groups[0] == pending_group:
+                # The batch only continues the pending group.
+                pending.append(batch)
+                continue
+
+            complete = pending + [batch.slice(0, last_start)]
+            if sum(part.num_rows for part in complete):
+                write(complete, writer)
+            pending = [batch.slice(last_start)]
+            pending_group = groups[-1]
+
+        if pending:
+            write(pending, writer)
+    finally:
+        writer.close()
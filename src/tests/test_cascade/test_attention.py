@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade import attention
+from scipy.stats import randint, poisson
+
+
+class ScalarUniform:
+    """Uniform attention on 1, ..., 5 with scalar only methods."""
+
+    def sf(self, x):
+        if not isinstance(x, int):
+            raise TypeError("x must be an int.")
+        return min(max(5 - x, 0), 5) / 5
+
+    def pmf(self, x):
+        if not isinstance(x, int):
+            raise TypeError("x must be an int.")
+        return 0.2 if 1 <= x <= 5 else 0.0
+
+
+class TestSurvival(unittest.TestCase):
+
+    def setUp(self):
+        attention.clear_cache()
+
+    def test_survival(self):
+        g = poisson(4)
+        values = attention.survival(g, 20)
+        for x in range(1, 21):
+            self.assertAlmostEqual(values[x - 1], g.sf(x) + g.pmf(x),
+                                   places=12, msg="Wrong G(x).")
+
+    def test_cache(self):
+        attention.survival(randint(1, 4), 10)
+        attention.survival(randint(1, 4), 5)
+        attention.survival(randint(1, 5), 5)
+        info = attention.cache_info()
+        msg = "Equal frozen distributions must share their cache entry."
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 2, 2),
+                         msg)
+
+    def test_array(self):
+        probabilities = np.array([0.0, 0.5, 0.25, 0.25])
+        values = attention.survival(probabilities, 5)
+        np.testing.assert_allclose(values, [1.0, 0.5, 0.25, 0.0, 0.0])
+
+    def test_scalar_distribution(self):
+        values = attention.survival(ScalarUniform(), 7)
+        np.testing.assert_allclose(values, [1.0, 0.8, 0.6, 0.4, 0.2, 0.0,
+                                            0.0])
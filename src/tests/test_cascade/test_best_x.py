@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.best_x import best_x, \
+                                                       best_x_full_capacity, \
+                                                       best_x_stack, \
+                                                       best_x_sweep
+from revenue_maximization_ranking.cascade.fixed_attention import dp_table
+from revenue_maximization_ranking.cascade.attention import survival
+from revenue_maximization_ranking.cascade.products import Products
+from scipy.stats import randint, geom, poisson
+
+
+class TestBestXFullCapacity(unittest.TestCase):
+
+    def test_incremental(self):
+        rng = np.random.default_rng(3)
+        revenue = rng.choice([1.0, 2.0, 3.5, 6.0], size=50)
+        probability = rng.choice([0.05, 0.2, 0.5], size=50)
+        products = {i: {"revenue": revenue[i], "probability": probability[i]}
+                    for i in range(50)}
+        for g in [randint(1, 30), geom(0.1)]:
+            expected = best_x_full_capacity(products, g, 40)
+            result = best_x_full_capacity(products, g, 40, incremental=True)
+            msg = "Incremental mode must give the same ranking and xs."
+            self.assertEqual(result, expected, msg)
+            self.assertGreater(len(expected[1]), 1, msg)
+
+
+class TestBestXSweep(unittest.TestCase):
+
+    def test_sweep(self):
+        rng = np.random.default_rng(22)
+        products = Products(np.arange(150), rng.choice([1.0, 2.0, 3.5], 150),
+                            rng.choice([0.05, 0.2, 0.5], 150))
+        capacities = [0, 1, 10, 20, 50, 100, 500]
+        for g in [randint(1, 40), geom(0.02), poisson(25)]:
+            rankings = best_x_sweep(products, g, capacities, show_xs=True)
+            for capacity in capacities:
+                ranking, best_xs = best_x_full_capacity(products, g, capacity)
+                self.assertEqual(list(rankings[capacity][0].ids),
+                                 list(ranking.ids))
+                self.assertEqual(rankings[capacity][1], best_xs)
+
+
+class TestBestXStack(unittest.TestCase):
+
+    def test_stack(self):
+        rng = np.random.default_rng(19)
+        products = {i: {"revenue": rng.lognormal(),
+                        "probability": rng.uniform(0, 0.5)}
+                    for i in range(60)}
+        gs = [randint(1, 4), randint(1, 30), geom(0.05), poisson(12),
+              np.array([0.0, 0.0, 1.0])]
+        xs, rankings = best_x_stack(products, gs, 20, offset=1)
+        for g, x, ranking in zip(gs, xs, rankings):
+            self.assertEqual((x, ranking), best_x(products, g, 20, offset=1))
+        self.assertGreater(len(set(xs)), 2)
+
+
+class TestApproximate(unittest.TestCase):
+
+    def test_gap(self):
+        rng = np.random.default_rng(16)
+        for epsilon in [1e-6, 0.05, 0.5]:
+            for g in [randint(1, 61), geom(0.05), poisson(30)]:
+                products = Products(np.arange(300), rng.lognormal(size=300),
+                                    rng.uniform(0, 0.3, 300))
+                order = products.key_order()
+                h, _ = dp_table(products.revenue[order],
+                                products.probability[order], 60)
+                exact = np.max(h[1:] * survival(g, 60))
+                x, ranking, gap = best_x(products, g, 60, epsilon=epsilon,
+                                         show_gap=True)
+                reach = np.cumprod(np.concatenate(
+                    ([1.0], 1.0 - ranking.probability[:-1])))
+                value = (np.sum(reach * ranking.probability
+                                * ranking.revenue) * survival(g, x)[-1])
+                self.assertLessEqual(exact - value, gap + 1e-9)
+                self.assertLessEqual(gap, epsilon * exact + 1e-9)
+
+    def test_full_capacity(self):
+        rng = np.random.default_rng(17)
+        products = {i: {"revenue": rng.choice([1.0, 2.0, 3.5, 6.0]),
+                        "probability": rng.choice([0.05, 0.2, 0.5])}
+                    for i in range(200)}
+        g = randint(1, 41)
+        expected = best_x_full_capacity(products, g, 40)
+        ranking, best_xs, gaps = best_x_full_capacity(products, g, 40,
+                                                      epsilon=1e-12,
+                                                      show_gap=True)
+        self.assertEqual(len(gaps), len(best_xs))
+        self.assertTrue(all(0.0 <= gap < 1e-9 for gap in gaps))
+        self.assertEqual(sum(best_xs), sum(expected[1]))
+        _, exact_gaps = best_x_full_capacity(products, g, 40, show_xs=False,
+                                             show_gap=True)
+        self.assertEqual(exact_gaps, [0.0] * len(expected[1]))
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from revenue_maximization_ranking.cascade import full_best_x
+from revenue_maximization_ranking.cascade.cache import RankingCache
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from scipy.stats import randint
+
+
+class TestRankingCache(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.df = pd.DataFrame({"revenue": rng.lognormal(size=30),
+                                "probability": rng.uniform(0, 0.5, 30)})
+        self.products = self.df.transpose().to_dict()
+
+    def test_hits(self):
+        cache = RankingCache()
+        expected = best_x_full_capacity(self.products, randint(1, 8), 10)
+        for _ in range(3):
+            result = cache.best_x_full_capacity(self.products, randint(1, 8),
+                                                10)
+            self.assertEqual(result, expected)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (2, 1))
+
+        cache.best_x_full_capacity(self.products, randint(1, 9), 10)
+        cache.best_x_full_capacity(self.products, randint(1, 8), 11)
+        self.assertEqual(cache.stats().misses, 3,
+                         "Distribution and capacity must be in the key.")
+
+    def test_full_best_x(self):
+        cache = RankingCache()
+        expected = full_best_x(self.df, "revenue", "probability",
+                               randint(1, 8))
+        for _ in range(2):
+            result = cache.full_best_x(self.df, "revenue", "probability",
+                                       randint(1, 8))
+            pd.testing.assert_series_equal(result, expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_eviction(self):
+        now = [0.0]
+        cache = RankingCache(maxsize=2, ttl=10.0, clock=lambda: now[0])
+        for high in [4, 5, 6]:
+            cache.best_x_full_capacity(self.products, randint(1, high), 5)
+        self.assertEqual((len(cache), cache.evictions), (2, 1))
+        now[0] = 11.0
+        cache.best_x_full_capacity(self.products, randint(1, 6), 5)
+        self.assertEqual((cache.expirations, cache.hits), (1, 0))
@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from revenue_maximization_ranking.cascade import full_best_x, \
+                                                 full_best_x_grouped, \
+                                                 full_best_x_sweep, \
+                                                 expected_revenue, \
+                                                 expected_revenue_grouped, \
+                                                 expected_revenue_matrix
+from scipy.stats import randint
+
+
+class TestFullBestXGrouped(unittest.TestCase):
+
+    def test_full_best_x_grouped(self):
+        rng = np.random.default_rng(5)
+        df = pd.DataFrame({"search": rng.integers(0, 20, 300),
+                           "revenue": rng.choice([1.0, 2.0, 3.0], 300),
+                           "probability": rng.choice([0.1, 0.4], 300)},
+                          index=rng.permutation(300))
+        g = randint(1, 6)
+        rank_column, best_xs = full_best_x_grouped(df, "search", "revenue",
+                                                   "probability", g,
+                                                   show_xs=True)
+        self.assertTrue(rank_column.index.equals(df.index))
+        for search, group in df.groupby("search"):
+            expected, xs = full_best_x(group, "revenue", "probability", g,
+                                       show_xs=True)
+            result = rank_column.loc[group.index].dropna().astype(int)
+            msg = f"Grouped ranking differs for search {search}."
+            pd.testing.assert_series_equal(result.sort_index(),
+                                           expected.sort_index(),
+                                           check_names=False, obj=msg)
+            self.assertEqual(best_xs[search], xs, msg)
+
+
+class TestNullGroups(unittest.TestCase):
+
+    def test_null_group(self):
+        df = pd.DataFrame({"search": ["a", "a", None, "b", "b", None],
+                           "revenue": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                           "probability": [0.1, 0.2, 0.3, 0.4, 0.2, 0.1]})
+        g = randint(1, 3)
+        df["rank"] = full_best_x_grouped(df, "search", "revenue",
+                                         "probability", g)
+        self.assertTrue(df["rank"][df["search"].isna()].isna().all())
+        revenues = expected_revenue_grouped(df, "search", "revenue",
+                                            "probability", "rank", g)
+        self.assertEqual(list(revenues.index), ["a", "b"])
+        for search, group in df.groupby("search"):
+            expected = expected_revenue(group, "revenue", "probability",
+                                        "rank", g)
+            self.assertAlmostEqual(revenues[search], expected, places=12)
+
+
+class TestFullBestXSweep(unittest.TestCase):
+
+    def test_full_best_x_sweep(self):
+        rng = np.random.default_rng(22)
+        df = pd.DataFrame({"revenue": rng.lognormal(size=60),
+                           "probability": rng.uniform(0, 0.4, 60)},
+                          index=[f"p{i}" for i in range(60)])
+        g = randint(1, 30)
+        ranks, revenues = full_best_x_sweep(df, "revenue", "probability", g,
+                                            [5, 10, 0])
+        for capacity in [5, 10, 0]:
+            expected = full_best_x(df, "revenue", "probability", g,
+                                   capacity=capacity)
+            pd.testing.assert_series_equal(
+                ranks[capacity].dropna(), expected.astype(float),
+                check_names=False, check_like=True)
+            df["rank"] = ranks[capacity]
+            self.assertAlmostEqual(revenues[capacity],
+                                   expected_revenue(df, "revenue",
+                                                    "probability", "rank", g),
+                                   places=12)
+
+
+class TestExpectedRevenueGrouped(unittest.TestCase):
+
+    def test_expected_revenue_grouped(self):
+        rng = np.random.default_rng(6)
+        df = pd.DataFrame({"search": rng.integers(0, 10, 100),
+                           "revenue": rng.lognormal(size=100),
+                           "probability": rng.uniform(0, 0.4, 100)})
+        g = randint(1, 8)
+        df["rank"] = full_best_x_grouped(df, "search", "revenue",
+                                         "probability", g, capacity=6)
+        revenues = expected_revenue_grouped(df, "search", "revenue",
+                                            "probability", "rank", g)
+        for search, group in df.groupby("search"):
+            expected = expected_revenue(group, "revenue", "probability",
+                                        "rank", g)
+            self.assertAlmostEqual(revenues[search], expected, places=12)
+
+    def test_expected_revenue_matrix(self):
+        rng = np.random.default_rng(19)
+        df = pd.DataFrame({"revenue": rng.lognormal(size=30),
+                           "probability": rng.uniform(0, 0.4, 30)})
+        gs = [randint(1, 8), randint(1, 20)]
+        df["a"] = full_best_x(df, "revenue", "probability", gs[0],
+                              capacity=6)
+        df["b"] = full_best_x(df, "revenue", "probability", gs[1])
+        revenues = expected_revenue_matrix(df, "revenue", "probability",
+                                           ["a", "b"], gs,
+                                           names=["short", "long"])
+        for col in ["a", "b"]:
+            for g, name in zip(gs, ["short", "long"]):
+                expected = expected_revenue(df, "revenue", "probability",
+                                            col, g)
+                self.assertAlmostEqual(revenues.loc[col, name], expected,
+                                       places=12)
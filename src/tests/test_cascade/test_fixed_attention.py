@@ -1,7 +1,9 @@
 import unittest
+import numpy as np
 
 from revenue_maximization_ranking.cascade\
-                                 .fixed_attention import optimal_rankings
+    .fixed_attention import optimal_rankings, fast_optimal_rankings, \
+    dominance_filter
 
 
 class TestOptimalRankings(unittest.TestCase):
@@ -26,3 +28,32 @@ class TestOptimalRankings(unittest.TestCase):
         self.assertEqual(rankings[2], [("b", p_b), ("a", p_a)], msg)
         self.assertEqual(revenues[2], 1.8, msg)
 
+    def test_fast_optimal_rankings(self):
+        rng = np.random.default_rng(0)
+        for n_products, capacity in [(1, 3), (8, 8), (40, 12), (60, 100)]:
+            revenue = rng.choice([1.0, 2.5, 4.0, 7.0], size=n_products)
+            probability = rng.choice([0.05, 0.3, 0.3, 0.9], size=n_products)
+            products = {f"p{i}": {"revenue": revenue[i],
+                                  "probability": probability[i]}
+                        for i in range(n_products)}
+            expected = optimal_rankings(products=products, capacity=capacity)
+            result = fast_optimal_rankings(products=products,
+                                           capacity=capacity)
+            msg = "fast_optimal_rankings differs from optimal_rankings."
+            self.assertEqual(result, expected, msg)
+
+    def test_dominance_filter(self):
+        rng = np.random.default_rng(1)
+        products = {i: {"revenue": rng.lognormal(),
+                        "probability": rng.uniform()} for i in range(300)}
+        capacity = 5
+        kept, n_discarded = dominance_filter(products, capacity)
+        msg = "dominance_filter must count the discarded products."
+        self.assertEqual(len(kept) + n_discarded, len(products), msg)
+        self.assertGreater(n_discarded, 0, msg)
+        _, expected = fast_optimal_rankings(products, capacity)
+        _, revenues = fast_optimal_rankings(kept, capacity)
+        for k in expected:
+            msg = f"dominance_filter changed the optimal revenue at k = {k}."
+            self.assertAlmostEqual(revenues[k], expected[k], places=12,
+                                   msg=msg)
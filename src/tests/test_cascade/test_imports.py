@@ -0,0 +1,33 @@
+import sys
+import subprocess
+import unittest
+
+import revenue_maximization_ranking.cascade as cascade
+
+
+class TestImports(unittest.TestCase):
+
+    def test_lightweight(self):
+        # A fresh interpreter, the tests themselves import pandas.
+        script = ("import sys\n"
+                  "import revenue_maximization_ranking.cascade.best_x\n"
+                  "import revenue_maximization_ranking.cascade"
+                  ".fixed_attention\n"
+                  "import revenue_maximization_ranking.cascade.revenue\n"
+                  "print(','.join(name for name in ('pandas', 'scipy')\n"
+                  "               if name in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "")
+
+    def test_lazy(self):
+        from revenue_maximization_ranking.cascade.dataframe import \
+            full_best_x
+        self.assertIs(cascade.full_best_x, full_best_x)
+        self.assertIn("expected_revenue_grouped", dir(cascade))
+        with self.assertRaises(AttributeError):
+            cascade.not_a_function
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from collections import Counter
+from revenue_maximization_ranking.cascade.learning import ClickCounts, \
+                                                         count_sessions, \
+                                                         aggregate_logs
+
+
+def make_log(rng, n_sessions, catalog):
+    shown = np.array([rng.choice(catalog, 6, replace=False)
+                      for _ in range(n_sessions)])
+    depth = rng.integers(0, 8, n_sessions)
+    purchase = np.where(rng.random(n_sessions) < 0.4,
+                        rng.integers(1, 7, n_sessions), 0)
+    purchase = np.minimum(purchase, depth)
+    return shown, depth, purchase
+
+
+def reference(shown, depth, purchase):
+    seen, purchased = Counter(), Counter()
+    for products, d, b in zip(shown, depth, purchase):
+        for t, product in enumerate(products, start=1):
+            if t > d or (b and t > b):
+                break
+            seen[product] += 1
+            purchased[product] += int(t == b)
+    return seen, purchased
+
+
+class TestLearning(unittest.TestCase):
+
+    def test_counts(self):
+        rng = np.random.default_rng(21)
+        catalog = np.array([f"sku-{i}" for i in range(15)])
+        log = make_log(rng, 500, catalog)
+        counts = count_sessions(*log, chunk_size=37)
+        seen, purchased = reference(*log)
+        self.assertEqual(dict(zip(counts.ids, counts.seen)), seen)
+        self.assertEqual({k: v for k, v in zip(counts.ids, counts.purchased)},
+                         {k: purchased[k] for k in seen})
+
+    def test_merge(self):
+        rng = np.random.default_rng(22)
+        logs = [make_log(rng, 200, np.arange(30)) for _ in range(3)]
+        full = count_sessions(*(np.concatenate(parts)
+                                for parts in zip(*logs)))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "counts.npz")
+            aggregate_logs(logs[:2]).save(path)
+            counts = aggregate_logs(logs[2:], ClickCounts.load(path))
+        np.testing.assert_array_equal(counts.ids, full.ids)
+        np.testing.assert_array_equal(counts.seen, full.seen)
+        np.testing.assert_array_equal(counts.purchased, full.purchased)
+
+    def test_padding(self):
+        shown = np.array([[3, 1, -1], [1, 2, 3]])
+        counts = count_sessions(shown, np.array([3, 3]), np.array([0, 2]),
+                                pad=-1)
+        df = counts.to_dataframe()
+        self.assertEqual(df["seen"].to_dict(), {1: 2, 2: 1, 3: 1})
+        self.assertEqual(df["probability"].to_dict(), {1: 0.0, 2: 1.0,
+                                                       3: 0.0})
+
+    def test_large_counts(self):
+        big = 2**53 + 1
+        counts = ClickCounts(["a"], [big], [big]).merge(
+            ClickCounts(["a", "b"], [2, 1], [0, 1]))
+        self.assertEqual(counts.seen.dtype, np.int64)
+        self.assertEqual(counts.seen.tolist(), [big + 2, 1])
+        self.assertEqual(counts.purchased.tolist(), [big, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
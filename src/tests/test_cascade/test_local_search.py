@@ -0,0 +1,88 @@
+import itertools
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.local_search import \
+    improve_ranking, best_x_local_search
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from revenue_maximization_ranking.cascade.revenue import expected_revenue, \
+                                                         expected_revenues
+from revenue_maximization_ranking.cascade.products import Products
+from scipy.stats import randint, geom, poisson
+
+
+class TestLocalSearch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        self.products = Products(np.arange(200), rng.lognormal(size=200),
+                                 rng.uniform(0, 0.6, 200))
+
+    def test_improvement(self):
+        for g in [randint(1, 21), geom(0.1), poisson(8)]:
+            start = best_x_full_capacity(self.products, g, 20, show_xs=False)
+            result = best_x_local_search(self.products, g, 20)
+            self.assertAlmostEqual(result.initial_revenue,
+                                   expected_revenue(start, g), places=10)
+            self.assertAlmostEqual(result.revenue,
+                                   expected_revenue(result.ranking, g),
+                                   places=10)
+            self.assertGreaterEqual(result.improvement, 0.0)
+            self.assertEqual(len(result.ranking), len(start))
+            self.assertEqual(len(set(result.ranking.ids)),
+                             len(result.ranking))
+
+    def test_local_optimum(self):
+        # No single swap or insert improves the result.
+        rng = np.random.default_rng(18)
+        revenue, probability = rng.lognormal(size=7), rng.uniform(0, 1, 7)
+        ranking = Products(np.arange(7), revenue, probability)
+        g = poisson(3)
+        result = improve_ranking(ranking, g, moves=("swap", "insert"))
+        best = result.ranking
+        for i, j in itertools.permutations(range(7), 2):
+            for move in ["swap", "insert"]:
+                order = list(range(7))
+                if move == "swap":
+                    order[i], order[j] = order[j], order[i]
+                else:
+                    order.insert(j, order.pop(i))
+                value = expected_revenues(best.revenue[order],
+                                          best.probability[order], g)
+                self.assertLessEqual(value, result.revenue + 1e-12)
+
+    def test_budgets(self):
+        g = randint(1, 31)
+        result = best_x_local_search(self.products, g, 30, max_iterations=1)
+        self.assertLessEqual(result.iterations, 1)
+        result = best_x_local_search(self.products, g, 30, time_limit=0.0)
+        self.assertEqual(result.iterations, 0)
+        self.assertEqual(result.improvement, 0.0)
+
+    def test_dictionary(self):
+        products = self.products.to_dict()
+        result = best_x_local_search(products, geom(0.1), 10)
+        for name, product in result.ranking:
+            self.assertIs(product, products[name])
+        with self.assertRaises(ValueError):
+            improve_ranking(result.ranking, geom(0.1), moves=["jump"])
+
+    def test_list_with_products(self):
+        g = geom(0.2)
+        # The worst products, replace moves bring in better ones.
+        order = np.argsort(self.products.revenue * self.products.probability)
+        ranking = list(self.products.take(order[:5]))
+        result = improve_ranking(ranking, g, products=self.products)
+        self.assertGreater(result.improvement, 0.0)
+        self.assertFalse({name for name, _ in result.ranking}
+                         <= {name for name, _ in ranking})
+        products = self.products.to_dict()
+        for name, product in result.ranking:
+            self.assertEqual(product, products[name])
+        self.assertAlmostEqual(result.revenue,
+                               expected_revenue(result.ranking, g),
+                               places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
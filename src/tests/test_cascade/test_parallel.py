@@ -0,0 +1,21 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.parallel import rank_many
+from scipy.stats import randint
+
+
+class TestRankMany(unittest.TestCase):
+
+    def test_rank_many(self):
+        rng = np.random.default_rng(2)
+        product_sets = [(rng.lognormal(size=n), rng.uniform(0, 0.5, size=n))
+                        for n in [5, 30, 1, 12, 40]]
+        g = randint(1, 10)
+        serial = rank_many(product_sets, g, capacity=15, workers=1)
+        pooled = rank_many(product_sets, g, capacity=15, workers=2)
+        msg = "Parallel results must match the serial ones, in order."
+        self.assertEqual(len(pooled), len(product_sets), msg)
+        for (positions, xs), (expected, expected_xs) in zip(pooled, serial):
+            np.testing.assert_array_equal(positions, expected, msg)
+            self.assertEqual(xs, expected_xs, msg)
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from revenue_maximization_ranking.cascade.products import Products
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from revenue_maximization_ranking.cascade.revenue import expected_revenue
+from scipy.stats import randint
+
+
+class TestProducts(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.df = pd.DataFrame({"revenue": rng.choice([1.0, 2.0, 5.0], 40),
+                                "probability": rng.choice([0.1, 0.3], 40)},
+                               index=[f"p{i}" for i in range(40)])
+        self.products = self.df.transpose().to_dict()
+
+    def test_from_dataframe(self):
+        products = Products.from_dataframe(self.df, "revenue", "probability")
+        msg = "Float64 columns must not be copied."
+        self.assertTrue(np.shares_memory(products.revenue,
+                                         self.df["revenue"].to_numpy()), msg)
+        self.assertEqual(products.to_dict(), self.products)
+
+    def test_best_x_full_capacity(self):
+        g = randint(1, 12)
+        products = Products.from_dict(self.products)
+        ranking, xs = best_x_full_capacity(products, g, 20)
+        expected, expected_xs = best_x_full_capacity(self.products, g, 20)
+        msg = "Products and dictionaries must give the same ranking."
+        self.assertIsInstance(ranking, Products)
+        self.assertEqual(list(ranking.ids), [name for name, _ in expected],
+                         msg)
+        self.assertEqual(xs, expected_xs, msg)
+        self.assertAlmostEqual(expected_revenue(ranking, g),
+                               expected_revenue(expected, g), places=12)
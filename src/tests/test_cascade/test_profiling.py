@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from revenue_maximization_ranking.cascade import full_best_x, \
+                                                 full_best_x_grouped
+from revenue_maximization_ranking.cascade.attention import clear_cache
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from revenue_maximization_ranking.cascade.profiling import profile, \
+                                                           ProfileStats
+from scipy.stats import randint
+
+
+class TestProfile(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(13)
+        self.df = pd.DataFrame({"revenue": rng.lognormal(size=40),
+                                "probability": rng.uniform(0, 0.5, 40),
+                                "search": rng.integers(0, 3, 40)})
+        clear_cache()
+
+    def test_full_best_x(self):
+        with profile() as stats:
+            _, best_xs = full_best_x(self.df, "revenue", "probability",
+                                     randint(1, 8), show_xs=True)
+
+        # The last round may find nothing worth ranking.
+        self.assertIn(stats.counters["best_x_rounds"],
+                      [len(best_xs), len(best_xs) + 1])
+        self.assertEqual(stats.round_sizes[0], 40)
+        self.assertEqual(stats.round_sizes[1], 40 - best_xs[0])
+        self.assertGreater(stats.counters["dp_cells"], 0)
+        self.assertEqual(stats.counters["sf_calls"], 1)
+        for name in ["load", "dp", "choose_x", "backtrack", "output"]:
+            self.assertIn(name, stats.stages)
+        self.assertGreaterEqual(stats.wall_time, sum(stats.stages.values()))
+
+        exported = stats.as_dict()
+        self.assertEqual(exported["round_sizes"], stats.round_sizes)
+        self.assertIn("time_dp", exported)
+
+    def test_incremental_and_prune(self):
+        products = self.df.transpose().to_dict()
+        for options in [{"incremental": True}, {"prune": True}]:
+            with profile() as stats:
+                best_x_full_capacity(products, randint(1, 8), 5, **options)
+            self.assertGreater(stats.counters["dp_cells"], 0, options)
+            self.assertGreater(stats.counters["best_x_rounds"], 0, options)
+
+    def test_grouped(self):
+        with profile() as stats:
+            full_best_x_grouped(self.df, "search", "revenue", "probability",
+                                randint(1, 8))
+        self.assertEqual(stats.counters["groups"], 3)
+
+    def test_disabled(self):
+        with profile(callback=lambda s: setattr(self, "seen", s)) as stats:
+            pass
+        self.assertIs(self.seen, stats)
+        self.assertIsInstance(stats, ProfileStats)
+
+        full_best_x(self.df, "revenue", "probability", randint(1, 8))
+        self.assertEqual(stats.counters, {},
+                         "Nothing is recorded outside the block.")
+
+
+if __name__ == '__main__':
+    unittest.main()
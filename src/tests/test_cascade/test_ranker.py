@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.ranker import Ranker
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from scipy.stats import randint
+
+
+class TestRanker(unittest.TestCase):
+
+    def assertSameRanking(self, ranker, products, g, capacity):
+        ranking, best_xs = ranker.ranking()
+        expected, expected_xs = best_x_full_capacity(products, g, capacity)
+        msg = "Ranker differs from best_x_full_capacity."
+        self.assertEqual(list(ranking.ids), [name for name, _ in expected],
+                         msg)
+        self.assertEqual(best_xs, expected_xs, msg)
+
+    def test_ranker(self):
+        rng = np.random.default_rng(9)
+        products = {i: {"revenue": rng.lognormal(),
+                        "probability": rng.uniform(0, 0.5)}
+                    for i in range(200)}
+        g = randint(1, 15)
+        ranker = Ranker(products, g, 20)
+        self.assertSameRanking(ranker, products, g, 20)
+
+        for i in [3, 150, 77]:
+            products[i] = {"revenue": rng.lognormal(),
+                           "probability": products[i]["probability"]}
+            ranker.update(i, revenue=products[i]["revenue"])
+            self.assertSameRanking(ranker, products, g, 20)
+
+        ranker.update(10, probability=0.99)
+        products[10] = {"revenue": products[10]["revenue"],
+                        "probability": 0.99}
+        self.assertSameRanking(ranker, products, g, 20)
+
+        ranker.insert("new", 50.0, 0.3)
+        products["new"] = {"revenue": 50.0, "probability": 0.3}
+        self.assertSameRanking(ranker, products, g, 20)
+
+        for i in ["new", 0, 199]:
+            ranker.remove(i)
+            del products[i]
+            self.assertSameRanking(ranker, products, g, 20)
+
+        # An update that keeps the row of the product.
+        product = products[100]
+        ranker.update(100, probability=product["probability"])
+        self.assertSameRanking(ranker, products, g, 20)
+
+    def test_unknown_product(self):
+        ranker = Ranker({"a": {"revenue": 1.0, "probability": 0.5}},
+                        randint(1, 3), 2)
+        for method in [ranker.remove, ranker.update]:
+            with self.assertRaisesRegex(KeyError, "'zz' is not ranked"):
+                method("zz")
+        with self.assertRaises(KeyError):
+            ranker.insert("a", 2.0, 0.1)
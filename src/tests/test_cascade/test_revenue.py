@@ -1,7 +1,11 @@
 import unittest
+import numpy as np
 
-from revenue_maximization_ranking.cascade.revenue import expected_revenue
-from scipy.stats import randint
+from revenue_maximization_ranking.cascade.revenue import expected_revenue, \
+                                                         expected_revenues, \
+                                                         revenue_matrix
+from revenue_maximization_ranking.cascade.attention import survival
+from scipy.stats import randint, geom, poisson
 
 
 class TestExpectedRevenue(unittest.TestCase):
@@ -17,3 +21,34 @@ class TestExpectedRevenue(unittest.TestCase):
         x = expected_revenue(ranking, g)
         self.assertAlmostEqual(x, y, places=10,
                                msg="Expected revenue failed the example!")
+
+    def test_revenues(self):
+        g = randint(1, 4)
+        revenue = np.array([[1.2, 2.2, 1.7], [2.2, 1.2, 0.0]])
+        probability = np.array([[0.1, 0.01, 0.05], [0.01, 0.1, 0.0]])
+        expected = [expected_revenue(
+                        [(i, {"revenue": r, "probability": p})
+                         for i, (r, p) in enumerate(zip(revenue[row],
+                                                        probability[row]))],
+                        g)
+                    for row in range(2)]
+        x = expected_revenues(revenue, probability, g)
+        np.testing.assert_allclose(x, expected, rtol=1e-12)
+
+    def test_matrix(self):
+        rng = np.random.default_rng(19)
+        revenue = rng.lognormal(size=(5, 12))
+        probability = rng.uniform(0, 0.4, (5, 12))
+        gs = [randint(1, 4), geom(0.2), poisson(6),
+              np.array([0.1, 0.2, 0.3, 0.4])]
+        expected = np.column_stack([expected_revenues(revenue, probability,
+                                                      g) for g in gs])
+        np.testing.assert_allclose(revenue_matrix(revenue, probability, gs),
+                                   expected, rtol=1e-12)
+        # Survival vectors shorter than the ranking, G is 0 after them.
+        survivals = np.array([survival(g, 8) for g in gs])
+        expected = [expected_revenues(revenue[0, :8], probability[0, :8], g)
+                    for g in gs]
+        np.testing.assert_allclose(revenue_matrix(revenue[0], probability[0],
+                                                  survivals),
+                                   expected, rtol=1e-12)
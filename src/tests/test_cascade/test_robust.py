@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.best_x import best_x
+from revenue_maximization_ranking.cascade.fixed_attention import dp_table, \
+                                                                backtrack
+from revenue_maximization_ranking.cascade.products import Products
+from revenue_maximization_ranking.cascade.revenue import expected_revenues
+from revenue_maximization_ranking.cascade.robust import robust_best_x, \
+    sample_probabilities, scenario_tables, scenario_assortments
+from scipy.stats import randint
+
+
+class TestRobust(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        self.products = Products(np.arange(80), rng.lognormal(size=80),
+                                 rng.uniform(0, 0.4, 80))
+        self.scenarios = sample_probabilities(
+            40, alpha=self.products.probability * 30 + 1,
+            beta=(1 - self.products.probability) * 30 + 1, seed=1)
+
+    def test_scenario_tables(self):
+        order = np.argsort(-self.products.revenue)
+        revenue = self.products.revenue[order]
+        scenarios = self.scenarios[:, order]
+        h, choice = scenario_tables(revenue, scenarios, 25)
+        xs = np.random.default_rng(2).integers(0, 26, 40)
+        members = scenario_assortments(choice, xs)
+        for s in range(40):
+            expected_h, expected_choice = dp_table(revenue, scenarios[s], 25)
+            np.testing.assert_allclose(h[s], expected_h, rtol=1e-12)
+            np.testing.assert_array_equal(
+                np.flatnonzero(members[s]), backtrack(expected_choice, xs[s]))
+
+    def test_nominal(self):
+        g = randint(1, 20)
+        scenarios = np.repeat(self.products.probability[None], 5, axis=0)
+        result = robust_best_x(self.products, g, 20, scenarios)
+        _, expected = best_x(self.products, g, 20)
+        self.assertEqual(list(result.ranking.ids), list(expected.ids))
+        self.assertEqual(result.n_candidates, 1)
+
+    def test_quantile(self):
+        g = randint(1, 20)
+        _, nominal = best_x(self.products, g, 20)
+        revenues = expected_revenues(
+            np.broadcast_to(nominal.revenue, (40, len(nominal))),
+            self.scenarios[:, nominal.ids], g)
+        for quantile in [None, 0.1]:
+            result = robust_best_x(self.products, g, 20, self.scenarios,
+                                   quantile=quantile)
+            score = np.mean(result.revenues) if quantile is None \
+                else np.quantile(result.revenues, quantile)
+            self.assertAlmostEqual(result.score, score, places=12)
+            nominal_score = np.mean(revenues) if quantile is None \
+                else np.quantile(revenues, quantile)
+            self.assertGreaterEqual(result.score, nominal_score)
+
+    def test_no_scenarios(self):
+        with self.assertRaises(ValueError):
+            robust_best_x(self.products, randint(1, 20), 20,
+                          np.zeros((0, 80)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import asyncio
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.service import AsyncRanker, \
+                                                         batch_payload
+from revenue_maximization_ranking.cascade.best_x import best_x_full_capacity
+from scipy.stats import randint
+
+
+class TestAsyncRanker(unittest.TestCase):
+
+    def test_rank(self):
+        rng = np.random.default_rng(10)
+        requests = [({i: {"revenue": rng.lognormal(),
+                          "probability": rng.uniform(0, 0.5)}
+                      for i in range(n)}, randint(1, 1 + n // 2), n // 2)
+                    for n in rng.integers(2, 40, size=12)]
+
+        async def main():
+            async with AsyncRanker(window=0.05, max_batch_size=5) as ranker:
+                results = await asyncio.gather(*[
+                    ranker.rank(products, g, capacity)
+                    for products, g, capacity in requests])
+                return results, ranker.stats()
+
+        results, stats = asyncio.run(main())
+        for (products, g, capacity), result in zip(requests, results):
+            self.assertEqual(result,
+                             best_x_full_capacity(products, g, capacity))
+        msg = "Concurrent requests must be batched."
+        self.assertEqual(stats.requests, 12, msg)
+        self.assertEqual((stats.batches, stats.max_batch_size), (3, 5), msg)
+        self.assertEqual((stats.queue_depth, stats.in_flight), (0, 0))
+
+    def test_batch_payload(self):
+        revenue, probability = np.ones(3), np.full(3, 0.5)
+        g = np.array([0.0, 0.5, 0.5])
+        tasks = [(revenue, probability, randint(1, 4), 2),
+                 (revenue, probability, g, 3),
+                 (revenue, probability, randint(1, 4), 1)]
+        distributions, indexed = batch_payload(tasks)
+        self.assertEqual(len(distributions), 2)
+        self.assertIs(distributions[1], g)
+        self.assertEqual([task[2:] for task in indexed],
+                         [(0, 2), (1, 3), (0, 1)])
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+
+from revenue_maximization_ranking.cascade.revenue import expected_revenue, \
+                                                         expected_revenues
+from revenue_maximization_ranking.cascade.simulate import simulate_revenue, \
+                                                          simulate_revenues
+from scipy.stats import randint, geom
+
+
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(14)
+        self.revenue = rng.lognormal(size=(4, 12))
+        self.probability = rng.uniform(0, 0.4, (4, 12))
+        self.revenue[3, 8:] = self.probability[3, 8:] = 0.0
+
+    def test_example(self):
+        ranking = [("A", {"revenue": 1.2, "probability": 0.1}),
+                   ("B", {"revenue": 2.2, "probability": 0.01}),
+                   ("C", {"revenue": 1.7, "probability": 0.05})]
+        result = simulate_revenue(ranking, randint(1, 4), sessions=200000,
+                                  seed=1)
+        expected = expected_revenue(ranking, randint(1, 4))
+        self.assertLessEqual(result.low, expected)
+        self.assertLessEqual(expected, result.high)
+        self.assertEqual(result.sessions, 200000)
+
+    def test_many_rankings(self):
+        for g in [geom(0.15), np.array([0.1, 0.2, 0.3, 0.2, 0.2])]:
+            # 99.9% intervals, chunks that do not divide the sessions.
+            result = simulate_revenues(self.revenue, self.probability, g,
+                                       sessions=100001, chunk_size=30000,
+                                       seed=2, confidence=0.999)
+            expected = expected_revenues(self.revenue, self.probability, g)
+            self.assertEqual(result.mean.shape, (4,))
+            self.assertTrue(np.all(result.low <= expected), g)
+            self.assertTrue(np.all(expected <= result.high), g)
+
+    def test_seed(self):
+        results = [simulate_revenues(self.revenue[0], self.probability[0],
+                                     geom(0.2), sessions=5000, seed=3)
+                   for _ in range(2)]
+        self.assertEqual(results[0], results[1])
+        self.assertIsInstance(results[0].mean, float)
+
+
+if __name__ == '__main__':
+    unittest.main()
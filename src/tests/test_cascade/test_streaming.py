@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import importlib.util
+import numpy as np
+import pandas as pd
+
+from revenue_maximization_ranking.cascade import full_best_x_grouped
+from revenue_maximization_ranking.cascade.streaming import rank_memmap, \
+                                                           rank_parquet
+from scipy.stats import randint
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(15)
+        df = pd.DataFrame({"search": rng.integers(0, 25, 400),
+                           "revenue": rng.choice([1.0, 2.0, 3.0], 400),
+                           "probability": rng.uniform(0, 0.5, 400)})
+        self.df = df.sort_values("search", kind="stable")\
+            .reset_index(drop=True)
+        self.g = randint(1, 6)
+        self.expected = full_best_x_grouped(self.df, "search", "revenue",
+                                            "probability", self.g,
+                                            capacity=8).to_numpy()
+
+    def test_memmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {}
+            for col in ["search", "revenue", "probability"]:
+                paths[col] = os.path.join(directory, f"{col}.npy")
+                np.save(paths[col], self.df[col].to_numpy())
+            out = os.path.join(directory, "rank.npy")
+            # Chunks smaller than the groups are extended.
+            rank_memmap(paths["search"], paths["revenue"],
+                        paths["probability"], self.g, capacity=8, out=out,
+                        chunk_size=7)
+            np.testing.assert_array_equal(np.load(out), self.expected)
+
+        ranks = rank_memmap(self.df["search"].to_numpy(),
+                            self.df["revenue"].to_numpy(),
+                            self.df["probability"].to_numpy(), self.g,
+                            capacity=8, chunk_size=1000)
+        np.testing.assert_array_equal(ranks, self.expected)
+
+    def test_not_contiguous(self):
+        groups = np.array([1, 1, 2, 1])
+        with self.assertRaises(ValueError):
+            rank_memmap(groups, np.ones(4), np.full(4, 0.5), self.g,
+                        chunk_size=2)
+
+    @unittest.skipIf(importlib.util.find_spec("pyarrow") is None,
+                     "pyarrow is not installed.")
+    def test_parquet(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "catalog.parquet")
+            destination = os.path.join(directory, "ranked.parquet")
+            self.df.to_parquet(source, index=False)
+            rank_parquet(source, destination, "search", "revenue",
+                         "probability", self.g, capacity=8, batch_size=7)
+            ranked = pd.read_parquet(destination)
+            np.testing.assert_array_equal(ranked["search"],
+                                          self.df["search"])
+            np.testing.assert_array_equal(ranked["rank"], self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()